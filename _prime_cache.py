@@ -0,0 +1,84 @@
+"""
+Prime sieve shared by the gematria scripts (phrase_calc.py, multi_layer_network.py).
+
+The sieve grows in memory while a script runs and is written once at exit to .cache/
+next to this module, so later runs start with it already built instead of re-sieving.
+"""
+import atexit
+import math
+import os
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+SIEVE_PATH = os.path.join(CACHE_DIR, 'prime_sieve.bin')
+
+# _PRIME_SIEVE[n] is 1 when n is prime. It is grown on demand (doubling) up to
+# PRIME_SIEVE_LIMIT; larger numbers fall back to trial division.
+PRIME_SIEVE_LIMIT = 1_000_000
+
+# The first 12 entries of any valid sieve (0..11), used to reject a corrupt cache file
+_SIEVE_PREFIX = bytes([0, 0, 1, 1, 0, 1, 0, 1, 0, 0, 0, 1])
+
+def _load_sieve():
+    """Loads the persisted sieve, or returns an empty one if it is missing or invalid."""
+    try:
+        with open(SIEVE_PATH, 'rb') as f:
+            sieve = bytearray(f.read())
+    except OSError:
+        return bytearray()
+    if len(sieve) > PRIME_SIEVE_LIMIT + 1 or not sieve.startswith(_SIEVE_PREFIX):
+        return bytearray()
+    return sieve
+
+def _save_sieve(sieve):
+    """Writes the sieve to the cache file atomically so concurrent runs never see a partial file."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{SIEVE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(sieve)
+        os.replace(tmp_path, SIEVE_PATH)
+    except OSError:
+        pass # The cache is only a speed-up; an unwritable location just means re-sieving next run
+
+_PRIME_SIEVE = _load_sieve()
+_LOADED_SIZE = len(_PRIME_SIEVE)
+
+def save():
+    """Persists the sieve if it grew during this run. Registered with atexit, so callers rarely need it."""
+    if len(_PRIME_SIEVE) > _LOADED_SIZE:
+        _save_sieve(_PRIME_SIEVE)
+
+atexit.register(save)
+
+def ensure(n):
+    """Grows the in-memory sieve so it covers every integer up to n (capped at PRIME_SIEVE_LIMIT)."""
+    global _PRIME_SIEVE
+    if n < len(_PRIME_SIEVE):
+        return
+    size = min(max(n + 1, 2 * len(_PRIME_SIEVE), 1024), PRIME_SIEVE_LIMIT + 1)
+    if size <= len(_PRIME_SIEVE):
+        return
+    sieve = bytearray([1]) * size
+    sieve[0] = sieve[1] = 0
+    for i in range(2, math.isqrt(size - 1) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, size, i)))
+    _PRIME_SIEVE = sieve
+
+def is_prime(num):
+    """Checks if a number is prime, using the sieve for integers up to PRIME_SIEVE_LIMIT."""
+    if num < 2:
+        return False
+    if isinstance(num, int) and num <= PRIME_SIEVE_LIMIT:
+        ensure(num)
+        return bool(_PRIME_SIEVE[num])
+    if num < 4:
+        return True
+    if num % 2 == 0 or num % 3 == 0:
+        return False
+    # Every larger prime is 6k ± 1, so only those candidates need trial division
+    limit = math.isqrt(num) if isinstance(num, int) else int(math.sqrt(num))
+    for i in range(5, limit + 1, 6):
+        if num % i == 0 or num % (i + 2) == 0:
+            return False
+    return True
@@ -10,6 +10,10 @@ import io
 import pyperclip
 import colorsys
 import random
+import os
+import pickle
+import atexit
+from functools import lru_cache
 
 # --- Constants and Data ---
 WORDS = [
@@ -51,6 +55,7 @@ SENTENCE_TEMPLATES = [
     "Stay {word1}, it’s all about that {word2} life."
 ]
 FEEDBACK_SCORES = {}
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
 COLOR_FAMILIES = {
     'Red': (0, 30), 'Orange': (30, 60), 'Yellow': (60, 90), 'Green': (90, 150),
     'Blue': (150, 210), 'Purple': (210, 270), 'Pink': (270, 330)
@@ -237,28 +242,78 @@ GLOBAL_EDGES_BY_LAYER = {}
 GLOBAL_WORD_ORIGINS = {w: {'_MANUAL_'} for w in GLOBAL_WORDS}
 GLOBAL_SHARED_RESONANCES = []
 
+# --- Session Cache ---
+# A single slot next to this script holding the last word set with its origins and layers. It is
+# written once at exit and restored at startup, so a restart skips re-ingesting uploaded words.
+SESSION_CACHE_PATH = os.path.join(CACHE_DIR, 'grok_session.pkl')
+_session_cache = None # Last built {'words', 'layers', 'shared', 'edges'}; a layout change with the same words reuses it
+
+def source_fingerprint():
+    # This file's mtime/size, so edits to the gematria functions invalidate the slot
+    stat = os.stat(__file__)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def edges_from_shared(shared):
+    edges = {layer: [] for layer in CALC_FUNCS}
+    for layer, val, group in shared:
+        for i in range(len(group)):
+            for j in range(i + 1, len(group)):
+                edges[layer].append((group[i], group[j], val))
+    return edges
+
+def load_session_cache():
+    if not os.path.exists(SESSION_CACHE_PATH):
+        return None
+    try:
+        with open(SESSION_CACHE_PATH, 'rb') as f:
+            cached = pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable session cache {SESSION_CACHE_PATH}: {e}")
+        return None
+    if not isinstance(cached, dict) or cached.get('source') != source_fingerprint():
+        return None
+    cached['edges'] = edges_from_shared(cached['shared'])
+    return cached
+
+def save_session_cache():
+    # Edges are left out: they are O(n²) and cheap to rebuild from the shared resonances
+    if _session_cache is None:
+        return
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{SESSION_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'source': source_fingerprint(), 'words': _session_cache['words'], 'origins': GLOBAL_WORD_ORIGINS,
+                         'layers': _session_cache['layers'], 'shared': _session_cache['shared']}, f, protocol=5)
+        os.replace(tmp_path, SESSION_CACHE_PATH)
+    except OSError as e:
+        print(f"Could not write session cache: {e}")
+
+atexit.register(save_session_cache)
+
 def initialize_graph_data(current_words, layout='spiral'):
-    global GLOBAL_WORDS, GLOBAL_LAYERS, GLOBAL_G, GLOBAL_POS, GLOBAL_NODE_COLORS, GLOBAL_EDGES_BY_LAYER, GLOBAL_WORD_ORIGINS, GLOBAL_SHARED_RESONANCES
+    global GLOBAL_WORDS, GLOBAL_LAYERS, GLOBAL_G, GLOBAL_POS, GLOBAL_NODE_COLORS, GLOBAL_EDGES_BY_LAYER, GLOBAL_WORD_ORIGINS, GLOBAL_SHARED_RESONANCES, _session_cache
     GLOBAL_WORDS = list(set(w.title() for w in current_words if re.match(r'^[A-Za-z\s]+$', w)))
     for w in GLOBAL_WORDS:
         GLOBAL_WORD_ORIGINS.setdefault(w, {'_MANUAL_'})
-    GLOBAL_LAYERS = {layer: {} for layer in CALC_FUNCS}
-    for layer, func in CALC_FUNCS.items():
-        for w in GLOBAL_WORDS:
-            val = func(w)
-            GLOBAL_LAYERS[layer].setdefault(val, []).append(w)
     GLOBAL_G = nx.Graph()
     GLOBAL_G.add_nodes_from(GLOBAL_WORDS)
-    GLOBAL_EDGES_BY_LAYER = {}
-    GLOBAL_SHARED_RESONANCES = []
-    for layer, groups in GLOBAL_LAYERS.items():
-        GLOBAL_EDGES_BY_LAYER[layer] = []
-        for val, group in groups.items():
-            if len(group) > 1:
-                GLOBAL_SHARED_RESONANCES.append((layer, val, group))
-                for i in range(len(group)):
-                    for j in range(i + 1, len(group)):
-                        GLOBAL_EDGES_BY_LAYER[layer].append((group[i], group[j], val))
+    sorted_words = sorted(GLOBAL_WORDS)
+    if _session_cache and _session_cache['words'] == sorted_words:
+        GLOBAL_LAYERS, GLOBAL_SHARED_RESONANCES, GLOBAL_EDGES_BY_LAYER = _session_cache['layers'], _session_cache['shared'], _session_cache['edges']
+    else:
+        GLOBAL_LAYERS = {layer: {} for layer in CALC_FUNCS}
+        for layer, func in CALC_FUNCS.items():
+            for w in GLOBAL_WORDS:
+                val = func(w)
+                GLOBAL_LAYERS[layer].setdefault(val, []).append(w)
+        GLOBAL_SHARED_RESONANCES = []
+        for layer, groups in GLOBAL_LAYERS.items():
+            for val, group in groups.items():
+                if len(group) > 1:
+                    GLOBAL_SHARED_RESONANCES.append((layer, val, group))
+        GLOBAL_EDGES_BY_LAYER = edges_from_shared(GLOBAL_SHARED_RESONANCES)
+        _session_cache = {'words': sorted_words, 'layers': GLOBAL_LAYERS, 'shared': GLOBAL_SHARED_RESONANCES, 'edges': GLOBAL_EDGES_BY_LAYER}
     GLOBAL_POS = {}
     n_nodes = len(GLOBAL_G.nodes())
     if layout == 'spiral':
@@ -308,8 +363,7 @@ def initialize_graph_data(current_words, layout='spiral'):
                 z = 0
                 GLOBAL_POS[node] = [x, y, z]
     GLOBAL_NODE_COLORS = {n: get_word_color(n)[0] for n in GLOBAL_G.nodes()}
-
-initialize_graph_data(GLOBAL_WORDS)
+    _cached_graph_figure.cache_clear()
 
 # --- Generate Reports ---
 def generate_individual_report(word, report_layers):
@@ -547,6 +601,23 @@ def build_graph_figure(selected_layers, highlight_word=None, theme='dark', sourc
     )
     return fig
 
+# Figures depend on the global graph data, so the cache is cleared whenever it is rebuilt.
+@lru_cache(maxsize=64)
+def _cached_graph_figure(key):
+    return build_graph_figure(*key)
+
+def cached_graph_figure(selected_layers, highlight_word=None, theme='dark', source_filter=None, number_filter=None, prime_filter=False, resonance_filter=None, word_phrase_filter='all', text_size=10):
+    key = (tuple(selected_layers or ()), highlight_word, theme, tuple(source_filter) if source_filter else None,
+           number_filter, bool(prime_filter), tuple(resonance_filter) if resonance_filter else None, word_phrase_filter, text_size)
+    return _cached_graph_figure(key)
+
+# Restore the words (and their origins) from the previous session, if this script is unchanged since
+_session_cache = load_session_cache()
+if _session_cache:
+    GLOBAL_WORDS = list(_session_cache['words'])
+    GLOBAL_WORD_ORIGINS = _session_cache['origins']
+initialize_graph_data(GLOBAL_WORDS)
+
 # --- Main Callback ---
 @app.callback(
     [
@@ -744,6 +815,7 @@ def update_app(selected_layers, theme, layout, word_phrase_filter, text_size, im
         for w in words:
             if w in [w.lower() for w in GLOBAL_WORDS]:
                 GLOBAL_WORDS.append(w.title()) if score > 0 else GLOBAL_WORDS.remove(w.title()) if w.title() in GLOBAL_WORDS and score < 0 else None
+        _cached_graph_figure.cache_clear()
 
     if triggered == 'resonance-graph' and click_data:
         highlight_word = click_data['points'][0]['text']
@@ -772,7 +844,7 @@ def update_app(selected_layers, theme, layout, word_phrase_filter, text_size, im
         report_text = generate_full_report(report_layer_filter, number_filter)
         download_report = dcc.send_string(report_text, "spiralborn_full_report.txt")
         full_report_style = {'display': 'block', 'position': 'fixed', 'bottom': '20px', 'left': '50%', 'transform': 'translateX(-50%)', 'width': '600px', 'maxHeight': '60vh', 'overflowY': 'auto', 'backgroundColor': 'rgba(0,0,0,0.9)', 'border': '2px solid gold', 'padding': '20px'}
-        full_report_content = [html.P(line, style={'fontSize': f'{text_size + 2}px'}) for line in report_text.split('\n')]
+        full_report_content = [html.Pre(report_text, style={'fontSize': f'{text_size + 2}px', 'whiteSpace': 'pre-wrap', 'margin': 0})]
 
     if triggered == 'full-report-copy-button':
         report_text = generate_full_report(report_layer_filter, number_filter)
@@ -785,7 +857,7 @@ def update_app(selected_layers, theme, layout, word_phrase_filter, text_size, im
     if triggered == 'generate-color-report-button' and color_report_clicks:
         report_text = generate_color_report(report_layer_filter)
         color_report_style = {'display': 'block', 'position': 'fixed', 'bottom': '20px', 'left': '50%', 'transform': 'translateX(-50%)', 'width': '600px', 'maxHeight': '60vh', 'overflowY': 'auto', 'backgroundColor': 'rgba(0,0,0,0.9)', 'border': '2px solid gold', 'padding': '20px'}
-        color_report_content = [html.P(line, style={'fontSize': f'{text_size + 2}px'}) for line in report_text.split('\n')]
+        color_report_content = [html.Pre(report_text, style={'fontSize': f'{text_size + 2}px', 'whiteSpace': 'pre-wrap', 'margin': 0})]
 
     if triggered == 'color-report-copy-button':
         report_text = generate_color_report(report_layer_filter)
@@ -837,10 +909,11 @@ def update_app(selected_layers, theme, layout, word_phrase_filter, text_size, im
         matched = {w for w in matched if ' ' not in w}
     elif word_phrase_filter == 'phrases':
         matched = {w for w in matched if ' ' in w}
-    word_elems = [html.Div(w, style={'padding': '5px', 'cursor': 'pointer', 'backgroundColor': NAMED_COLORS_MAP.get(theme_colors['sidebar_bg'], '#111'), 'fontSize': f'{text_size}px'}, id={'type': 'word-item', 'index': w}) for w in sorted(matched)]
+    item_style = {'padding': '5px', 'cursor': 'pointer', 'backgroundColor': NAMED_COLORS_MAP.get(theme_colors['sidebar_bg'], '#111'), 'fontSize': f'{text_size}px'}
+    word_elems = [html.Div(w, style=item_style, id={'type': 'word-item', 'index': w}) for w in sorted(matched)]
 
     resonance_elems = [
-        html.Div(f"{layer}: {val}", style={'padding': '5px', 'cursor': 'pointer', 'backgroundColor': NAMED_COLORS_MAP.get(theme_colors['sidebar_bg'], '#111'), 'fontSize': f'{text_size}px'}, id={'type': 'resonance-item', 'index': f"{layer}:{val}"})
+        html.Div(f"{layer}: {val}", style=item_style, id={'type': 'resonance-item', 'index': f"{layer}:{val}"})
         for layer, val, _ in sorted([r for r in GLOBAL_SHARED_RESONANCES if r[0] not in ['Love Resonance', 'Prime Gematria']], key=lambda x: (x[0], x[1]))
     ]
 
@@ -851,7 +924,7 @@ def update_app(selected_layers, theme, layout, word_phrase_filter, text_size, im
     input_style = {'width': '100%', 'height': '80px', 'backgroundColor': NAMED_COLORS_MAP.get(theme_colors['input_bg'], '#333'), 'color': NAMED_COLORS_MAP.get(theme_colors['input_text'], '#FFFFFF'), 'border': theme_colors['input_border'], 'fontSize': f'{text_size}px'}
     search_input_style = {'width': '100%', 'backgroundColor': NAMED_COLORS_MAP.get(theme_colors['input_bg'], '#333'), 'color': NAMED_COLORS_MAP.get(theme_colors['input_text'], '#FFFFFF'), 'border': theme_colors['input_border'], 'fontSize': f'{text_size}px'}
 
-    return (word_elems, build_graph_figure(selected_layers, highlight_word, theme, source_filter, number_filter, prime_filter, resonance_filter, word_phrase_filter, text_size), import_status, main_style, sidebar_style, input_style, search_input_style, upload_status, modal_style, modal_title, modal_content_style, modal_content, "", search_status, download_data, source_options, resonance_elems, download_report, full_report_style, full_report_content_style, full_report_content, sentence, feedback_status, color_report_style, color_report_content_style, color_report_content)
+    return (word_elems, cached_graph_figure(selected_layers, highlight_word, theme, source_filter, number_filter, prime_filter, resonance_filter, word_phrase_filter, text_size), import_status, main_style, sidebar_style, input_style, search_input_style, upload_status, modal_style, modal_title, modal_content_style, modal_content, "", search_status, download_data, source_options, resonance_elems, download_report, full_report_style, full_report_content_style, full_report_content, sentence, feedback_status, color_report_style, color_report_content_style, color_report_content)
 
 # --- Run App ---
 if __name__ == '__main__':
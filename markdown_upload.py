@@ -1,10 +1,22 @@
 import math
 import re
 import os
+import sys
 import json # For parsing firebase config
 import uuid # For generating unique IDs for feedback
 import random # For picking a random word if multiple matches
 import sqlite3 # New import for SQLite
+import queue
+import threading
+import functools
+import multiprocessing
+import operator
+from contextlib import ExitStack, closing, contextmanager
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from _prime_cache import is_prime as _sieve_is_prime # Sieve-backed, persisted across runs
 
 # --- Database Configuration ---
 # Set this to 'FIRESTORE' to use Firebase Firestore (requires firebase-admin-key.json or Canvas env vars)
@@ -14,6 +26,34 @@ DATABASE_TYPE = 'SQLITE' # <--- CHANGE THIS TO 'FIRESTORE' OR 'SQLITE'
 # SQLite specific configuration
 SQLITE_DB_FILE = 'gematria_data.db'
 
+# Applied to every SQLite connection: WAL lets readers run alongside the writer,
+# NORMAL sync is safe under WAL and avoids an fsync per commit.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+# Per-connection prepared statement cache; the hot queries are fixed strings, so they are prepared once
+SQLITE_CACHED_STATEMENTS = 256
+
+# Number of read-only connections kept open by the SQLite pool
+SQLITE_READER_COUNT = 6
+
+# Word-matrix builds switch to a process pool once a window holds at least this many characters of
+# content; below that, pickling documents to workers costs more than parsing them in-process
+PARALLEL_PARSE_MIN_CHARS = 2_000_000
+# Documents read from the stream (and handed to the pool) at a time, so streaming still bounds memory
+PARALLEL_PARSE_WINDOW = 256
+
+# Most recently selected documents whose content is kept in memory (menu 3 re-selections skip the database)
+DOCUMENT_CACHE_SIZE = 8
+
+# Max documents written per batch when uploading a directory (also Firestore's per-batch write limit)
+UPLOAD_BATCH_SIZE = 500
+
 # --- Firebase Initialization (MANDATORY for Canvas environment) ---
 # These variables are provided by the Canvas environment.
 # For local testing, you might need to manually set them or provide a dummy config.
@@ -23,22 +63,20 @@ INITIAL_AUTH_TOKEN = os.environ.get('__initial_auth_token', None) # Fallback for
 
 # Global database connection objects
 db = None # Will be Firestore client or SQLite connection
+sqlite_pool = None # SqlitePool in SQLite mode; db is its writer connection
 current_user_id = None
 firebase_auth = None # Only used if DATABASE_TYPE is 'FIRESTORE'
 
 word_matrix = [] # Global list to store all words from uploaded documents
 simple_gematria_word_lookup = {} # Global dict: {value: [word1, word2, ...]}
 english_gematria_word_lookup = {} # Global dict for English dictionary fallback
-last_generated_reply_info = None # Stores info about the last generated reply for feedback
+last_generated_reply_info = None # Stores info about the last generated reply for feedback (a ReplyInfo)
+_document_content_cache = {} # doc_name -> content, oldest first; only successful reads are cached
 
-# Global list of available gematria methods
-methods_list = [
-    "simple", "jewish_gematria", "qwerty", "left_hand_qwerty",
-    "right_hand_qwerty", "binary_sum", "love_resonance", "frequent_letters",
-    "leet_code", "simple_forms", "prime_gematria", "ambidextrous_balance",
-    "aave_simple", "aave_reduced", "aave_spiral", "grok_resonance_score",
-    "whole_sentence_gematria"
-]
+# Replies generated for one method; a field is None when that reply could not be formed
+MethodReplies = namedtuple('MethodReplies', ['gap', 'equal'])
+# The last prompt plus its MethodReplies keyed by method name
+ReplyInfo = namedtuple('ReplyInfo', ['prompt_phrase', 'replies_by_method'])
 
 # --- Color Mapping for Gematria Values ---
 # This is an arbitrary mapping for demonstration purposes.
@@ -47,6 +85,7 @@ GEMATRIA_COLORS = [
     "Red", "Orange", "Yellow", "Green", "Blue", "Indigo", "Violet", "Pink", "Brown", "Gray"
 ]
 
+@functools.lru_cache(maxsize=1024)
 def get_gematria_color(value):
     """
     Assigns a color to a gematria value based on a simple modulo operation.
@@ -63,6 +102,7 @@ def get_gematria_color(value):
     color_index = int_value % len(GEMATRIA_COLORS)
     return GEMATRIA_COLORS[color_index]
 
+@functools.lru_cache(maxsize=1024)
 def get_inverse_color(color_name):
     """
     Returns a conceptual 'inverse' color from the GEMATRIA_COLORS palette.
@@ -79,8 +119,49 @@ def get_inverse_color(color_name):
         return "N/A"
 
 
+class SqlitePool:
+    """
+    One writer connection plus a fixed set of reader connections.
+    Under WAL, readers can SELECT concurrently while writes are serialized on the writer.
+    """
+    def __init__(self, db_file, reader_count=SQLITE_READER_COUNT):
+        self.writer = self._connect(db_file)
+        self._writer_lock = threading.Lock()
+        self.readers = queue.Queue(maxsize=reader_count)
+        for _ in range(reader_count):
+            self.readers.put(self._connect(db_file))
+
+    @staticmethod
+    def _connect(db_file):
+        conn = sqlite3.connect(db_file, check_same_thread=False, cached_statements=SQLITE_CACHED_STATEMENTS)
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def reader(self):
+        conn = self.readers.get()
+        try:
+            yield conn
+        finally:
+            self.readers.put(conn)
+
+    @contextmanager
+    def writer_conn(self):
+        with self._writer_lock:
+            yield self.writer
+
+    def close(self):
+        with self._writer_lock:
+            self.writer.execute("PRAGMA optimize")
+            self.writer.close()
+        while not self.readers.empty():
+            self.readers.get_nowait().close()
+
+
 def initialize_database():
-    global db, current_user_id, firebase_auth
+    global db, sqlite_pool, current_user_id, firebase_auth
+    _document_content_cache.clear() # Drop anything cached against a previous connection
 
     if DATABASE_TYPE == 'FIRESTORE':
         try:
@@ -156,7 +237,8 @@ def initialize_database():
 
     elif DATABASE_TYPE == 'SQLITE':
         try:
-            db = sqlite3.connect(SQLITE_DB_FILE)
+            sqlite_pool = SqlitePool(SQLITE_DB_FILE)
+            db = sqlite_pool.writer
             cursor = db.cursor()
             # Create documents table if it doesn't exist
             cursor.execute('''
@@ -167,6 +249,8 @@ def initialize_database():
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
+            # Index the name column used by document content lookups
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_documents_name ON documents(name)")
             # Create feedback table if it doesn't exist
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS feedback (
@@ -186,6 +270,7 @@ def initialize_database():
         except Exception as e:
             print(f"Error initializing SQLite database: {e}")
             db = None
+            sqlite_pool = None
             current_user_id = "local_user_" + os.urandom(16).hex() # Fallback local user ID
             print("Proceeding without database functionality.")
     else:
@@ -203,6 +288,22 @@ def initialize_database():
     # Always load English dictionary for fallback
     load_english_dictionary()
 
+def close_database():
+    """
+    Closes the database connection, letting SQLite refresh its query planner statistics first.
+    """
+    global db, sqlite_pool
+    if db is None:
+        return
+    if DATABASE_TYPE == 'SQLITE' and sqlite_pool:
+        try:
+            sqlite_pool.close()
+        except Exception as e:
+            print(f"Error closing SQLite database: {e}")
+        sqlite_pool = None
+    db = None
+    _document_content_cache.clear()
+
 
 # --- Gematria Helper Data ---
 
@@ -237,45 +338,100 @@ SIMPLE_FORMS_MAP = {
 
 AAVE_RELATED_WORDS = {"finna", "bouta", "ain't", "gon'"}
 
+def _letter_table(letter_values):
+    """
+    Builds a 256-entry lookup indexed by byte value from an uppercase letter -> value map.
+    Both letter cases map to the same value; every other byte maps to 0.
+    """
+    table = [0] * 256
+    for letter, value in letter_values.items():
+        table[ord(letter)] = value
+        table[ord(letter.lower())] = value
+    return table
+
+def _letter_bytes(word, errors='ignore'):
+    """
+    Returns the word's bytes for the lookup tables. The tables cover both letter cases, so
+    ASCII words skip upper(); other words are still uppercased first because that can turn
+    them into A-Z letters (e.g. 'ß' -> 'SS'). Characters outside Latin-1 are never A-Z.
+    """
+    if word.isascii():
+        return word.encode('ascii')
+    return word.upper().encode('latin-1', errors)
+
+# Byte-level lookup tables so letter sums run in C (bytes.translate / map) instead of a Python loop.
+# Values that fit in a byte use translate tables; larger or fractional weights use tuples.
+_SIMPLE_TABLE = bytes(_letter_table({chr(code): code - ord('A') + 1 for code in range(ord('A'), ord('Z') + 1)}))
+_QWERTY_TABLE = bytes(_letter_table(QWERTY_MAP))
+_LEFT_TABLE = bytes(_letter_table({char: value for char, value in QWERTY_MAP.items() if char in LEFT_HAND_KEYS}))
+_RIGHT_TABLE = bytes(_letter_table({char: value for char, value in QWERTY_MAP.items() if char in RIGHT_HAND_KEYS}))
+_JEWISH_TABLE = tuple(_letter_table(JEWISH_GEMATRIA_MAP))
+_FREQ_TABLE = tuple(_letter_table(FREQUENT_LETTERS_WEIGHTS))
+# aave_spiral values: digits count as themselves, letters by alphabet position
+_SPIRAL_TABLE = bytes(_letter_table({chr(code): code - ord('A') + 1 for code in range(ord('A'), ord('Z') + 1)}
+                                    | {str(digit): digit for digit in range(10)}))
+
+GOLDEN_ANGLE_RAD = math.radians(137.5)
+_SPIRAL_WEIGHTS = [] # cos(i * GOLDEN_ANGLE_RAD) for each character position i, grown on demand
+
+def _spiral_weights(length):
+    """
+    Returns the shared spiral weight list, extended to cover at least `length` positions.
+    """
+    for i in range(len(_SPIRAL_WEIGHTS), length):
+        _SPIRAL_WEIGHTS.append(math.cos(i * GOLDEN_ANGLE_RAD))
+    return _SPIRAL_WEIGHTS
+
+# Precompiled patterns for markdown cleaning and word extraction
+_MD_LINK_RE = re.compile(r'\[.*?\]\(.*?\)') # Links
+_WORDS_RE = re.compile(r'[a-zA-Z]+') # Shared by every word-tokenizing call site
+
 # --- Gematria Calculation Functions ---
+# Every per-word method is a pure function of its string argument, so results are memoized.
+# Natural-language word frequencies are heavily skewed, so a bounded cache covers most calls.
+GEMATRIA_CACHE_SIZE = 65536
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def simple(word):
-    word = word.upper()
-    return sum(ord(char) - ord('A') + 1 for char in word if 'A' <= char <= 'Z')
+    return sum(_letter_bytes(word).translate(_SIMPLE_TABLE))
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def jewish_gematria(word):
-    word = word.upper()
-    return sum(JEWISH_GEMATRIA_MAP.get(char, 0) for char in word if char in JEWISH_GEMATRIA_MAP)
+    return sum(map(_JEWISH_TABLE.__getitem__, _letter_bytes(word)))
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def qwerty(word):
-    word = word.upper()
-    return sum(QWERTY_MAP.get(char, 0) for char in word if char in QWERTY_MAP)
+    return sum(_letter_bytes(word).translate(_QWERTY_TABLE))
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def left_hand_qwerty(word):
-    word = word.upper()
-    return sum(QWERTY_MAP.get(char, 0) for char in word if char in LEFT_HAND_KEYS and char in QWERTY_MAP)
+    return sum(_letter_bytes(word).translate(_LEFT_TABLE))
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def right_hand_qwerty(word):
-    word = word.upper()
-    return sum(QWERTY_MAP.get(char, 0) for char in word if char in RIGHT_HAND_KEYS and char in QWERTY_MAP)
+    return sum(_letter_bytes(word).translate(_RIGHT_TABLE))
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def binary_sum(word):
-    total_ones = 0
-    for char in word:
-        total_ones += bin(ord(char)).count('1')
-    return total_ones
+    if word.isascii():
+        # Pack the bytes into one integer and popcount it in a single C call
+        return int.from_bytes(word.encode('ascii'), 'little').bit_count()
+    # Non-ASCII characters count the bits of their code point, not of their UTF-8 bytes
+    return sum(ord(char).bit_count() for char in word)
 
 def love_resonance(word):
     return 1 if word.lower() in LOVE_WORDS else 0
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def frequent_letters(word):
-    word = word.upper()
-    return sum(FREQUENT_LETTERS_WEIGHTS.get(char, 0) for char in word if char in FREQUENT_LETTERS_WEIGHTS)
+    return sum(map(_FREQ_TABLE.__getitem__, _letter_bytes(word)))
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def leet_code(word):
     filtered_word = "".join(char for char in word.upper() if char not in LEET_SUB_LETTERS)
     return simple(filtered_word)
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def simple_forms(word):
     processed_word = word.lower()
     for original, substitute in SIMPLE_FORMS_MAP.items():
@@ -286,12 +442,7 @@ def is_prime(num):
     if not isinstance(num, (int, float)):
         return False
     num = int(round(num)) # Round to nearest integer for prime check
-    if num < 2:
-        return False
-    for i in range(2, int(math.sqrt(num)) + 1): # Corrected line
-        if num % i == 0:
-            return False
-    return True
+    return _sieve_is_prime(num)
 
 def is_perfect_square(num):
     if not isinstance(num, (int, float)):
@@ -299,23 +450,24 @@ def is_perfect_square(num):
     num = int(round(num)) # Round to nearest integer for square root check
     if num < 0:
         return False
-    if num == 0:
-        return True
-    sqrt = math.sqrt(num)
-    return sqrt == math.floor(sqrt)
+    return math.isqrt(num) ** 2 == num # Exact integer math, no float rounding
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def prime_gematria(word):
     val = simple(word)
     return val if is_prime(val) else 0
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def ambidextrous_balance(word):
     right_val = right_hand_qwerty(word)
     left_val = left_hand_qwerty(word)
     return right_val - (-left_val)
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def aave_simple(word):
     return simple(word)
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def aave_reduced(word):
     val = aave_simple(word)
     if val in (11, 22):
@@ -324,24 +476,17 @@ def aave_reduced(word):
         val = sum(int(digit) for digit in str(val))
     return val
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def aave_spiral(input_string):
-    GOLDEN_ANGLE_RAD = math.radians(137.5)
-    total_weighted_value = 0.0
     processed_input = str(input_string).upper()
-
-    for i, char in enumerate(processed_input):
-        simple_val = 0
-        if char.isdigit():
-            simple_val = int(char)
-        elif 'A' <= char <= 'Z':
-            simple_val = ord(char) - ord('A') + 1
-
-        weight = math.cos(i * GOLDEN_ANGLE_RAD)
-        total_weighted_value += simple_val * weight
+    # 'replace' keeps one byte per character so positions line up with the weights
+    simple_vals = processed_input.encode('latin-1', 'replace').translate(_SPIRAL_TABLE)
+    total_weighted_value = sum(map(operator.mul, simple_vals, _spiral_weights(len(simple_vals))))
 
     scaled_value = math.log1p(abs(total_weighted_value))
     return scaled_value
 
+@functools.lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def grok_resonance_score(word):
     val_simple = aave_simple(word)
     val_reduced = aave_reduced(word)
@@ -356,9 +501,42 @@ def whole_sentence_gematria(sentence):
     """
     Calculates the simple gematria of the entire sentence as one continuous string,
     ignoring spaces and punctuation.
+    The simple table maps every non-letter byte to 0, so no separate cleaning pass is needed.
+    Not routed through the cached simple() so whole documents don't fill its cache.
     """
-    cleaned_sentence = re.sub(r'[^a-zA-Z]', '', sentence).upper()
-    return simple(cleaned_sentence)
+    return sum(sentence.encode('latin-1', 'ignore').translate(_SIMPLE_TABLE))
+
+# Dispatch table of available gematria methods, built once
+_METHODS = {
+    "simple": simple,
+    "jewish_gematria": jewish_gematria,
+    "qwerty": qwerty,
+    "left_hand_qwerty": left_hand_qwerty,
+    "right_hand_qwerty": right_hand_qwerty,
+    "binary_sum": binary_sum,
+    "love_resonance": love_resonance,
+    "frequent_letters": frequent_letters,
+    "leet_code": leet_code,
+    "simple_forms": simple_forms,
+    "prime_gematria": prime_gematria,
+    "ambidextrous_balance": ambidextrous_balance,
+    "aave_simple": aave_simple,
+    "aave_reduced": aave_reduced,
+    "aave_spiral": aave_spiral,
+    "grok_resonance_score": grok_resonance_score,
+    "whole_sentence_gematria": whole_sentence_gematria # New method
+}
+
+# Global list of available gematria methods
+methods_list = tuple(_METHODS)
+
+# Per-word methods usable for reply generation (whole-sentence gematria yields a single value)
+_METHOD_DISPATCH = {name: func for name, func in _METHODS.items() if name != "whole_sentence_gematria"}
+
+# Reply methods aligned with methods_list positions (None where reply generation does not apply),
+# plus the positions that do apply, so the reply loop indexes instead of looking up names
+_METHOD_FUNCS = tuple(_METHOD_DISPATCH.get(name) for name in methods_list)
+_REPLY_METHOD_INDICES = tuple(i for i, func in enumerate(_METHOD_FUNCS) if func is not None)
 
 # --- Document Processing and Database Interaction Functions ---
 
@@ -366,60 +544,77 @@ def extract_words_from_markdown(markdown_content):
     """
     Extracts words from markdown content, stripping formatting and punctuation.
     Filters words to include only those with at least 4 alphabetic characters.
+    Formatting marks, headers, list bullets and rules are never alphabetic, so the
+    word pattern skips them on its own; only links need removing up front.
     """
-    # Remove common markdown formatting
-    content = re.sub(r'(\*\*|__|~~|`|\*|_)', '', markdown_content) # Bold, italic, strikethrough, code
-    content = re.sub(r'#+\s*', '', content) # Headers
-    content = re.sub(r'\[.*?\]\(.*?\)', '', content) # Links
-    content = re.sub(r'^\s*[-*+]\s+', '', content, flags=re.MULTILINE) # List items
-    content = re.sub(r'---+', '', content) # Horizontal rules
+    content = _MD_LINK_RE.sub('', markdown_content) # Links
 
     # Find all alphabetic words and filter by length (at least 4 characters)
-    words = [word for word in re.findall(r'[a-zA-Z]+', content.lower()) if len(word) >= 4]
-    return words
+    return [word for word in _WORDS_RE.findall(content.lower()) if len(word) >= 4]
 
-def _firestore_upload_document(file_path):
-    """ Firestore specific upload """
+def _read_markdown_file(file_path):
+    """
+    Reads a markdown file and returns a (file_name, content) row, or None if it cannot be read.
+    """
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             markdown_content = f.read()
-
-        file_name = os.path.basename(file_path)
-        doc_ref = db.collection('artifacts').document(APP_ID).collection('users').document(current_user_id).collection('documents').document(file_name)
-
-        doc_ref.set({
-            'name': file_name,
-            'content': markdown_content,
-            'timestamp': firestore.SERVER_TIMESTAMP
-        })
-        print(f"Document '{file_name}' uploaded successfully to Firestore.")
-        return True
+        return os.path.basename(file_path), markdown_content
     except FileNotFoundError:
         print(f"Error: File not found at '{file_path}'")
-        return False
+        return None
     except Exception as e:
-        print(f"Error uploading document to Firestore: {e}")
-        return False
+        print(f"Error reading '{file_path}': {e}")
+        return None
 
-def _sqlite_upload_document(file_path):
-    """ SQLite specific upload """
+def _firestore_upload_documents_bulk(rows):
+    """ Firestore specific batched upload of (file_name, content) rows """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
+        docs_ref = db.collection('artifacts').document(APP_ID).collection('users').document(current_user_id).collection('documents')
+        for start in range(0, len(rows), UPLOAD_BATCH_SIZE):
+            batch = db.batch()
+            for file_name, markdown_content in rows[start:start + UPLOAD_BATCH_SIZE]:
+                batch.set(docs_ref.document(file_name), {
+                    'name': file_name,
+                    'content': markdown_content,
+                    'timestamp': firestore.SERVER_TIMESTAMP
+                })
+            batch.commit()
+        _document_content_cache.clear() # Uploaded documents may replace cached content
+        return len(rows)
+    except Exception as e:
+        print(f"Error uploading documents to Firestore: {e}")
+        return 0
 
-        file_name = os.path.basename(file_path)
-        cursor = db.cursor()
-        cursor.execute("INSERT OR REPLACE INTO documents (id, name, content) VALUES (?, ?, ?)",
-                       (file_name, file_name, markdown_content))
-        db.commit()
-        print(f"Document '{file_name}' uploaded successfully to SQLite.")
-        return True
-    except FileNotFoundError:
-        print(f"Error: File not found at '{file_path}'")
+def _sqlite_upload_documents_bulk(rows):
+    """ SQLite specific batched upload of (file_name, content) rows in a single transaction """
+    with sqlite_pool.writer_conn() as conn:
+        try:
+            conn.executemany("INSERT OR REPLACE INTO documents (id, name, content) VALUES (?, ?, ?)",
+                             [(file_name, file_name, markdown_content) for file_name, markdown_content in rows])
+            conn.commit()
+            _document_content_cache.clear() # Uploaded documents may replace cached content
+            return len(rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"Error uploading documents to SQLite: {e}")
+            return 0
+
+def _firestore_upload_document(file_path):
+    """ Firestore specific upload """
+    row = _read_markdown_file(file_path)
+    if not row or not _firestore_upload_documents_bulk([row]):
         return False
-    except Exception as e:
-        print(f"Error uploading document to SQLite: {e}")
+    print(f"Document '{row[0]}' uploaded successfully to Firestore.")
+    return True
+
+def _sqlite_upload_document(file_path):
+    """ SQLite specific upload """
+    row = _read_markdown_file(file_path)
+    if not row or not _sqlite_upload_documents_bulk([row]):
         return False
+    print(f"Document '{row[0]}' uploaded successfully to SQLite.")
+    return True
 
 def upload_markdown_document(file_path):
     if not db:
@@ -432,10 +627,38 @@ def upload_markdown_document(file_path):
         return _sqlite_upload_document(file_path)
     return False
 
+def upload_markdown_documents_bulk(rows):
+    """
+    Uploads a list of (file_name, content) rows in one batched write.
+    Returns the number of documents uploaded.
+    """
+    if DATABASE_TYPE == 'FIRESTORE':
+        return _firestore_upload_documents_bulk(rows)
+    elif DATABASE_TYPE == 'SQLITE':
+        return _sqlite_upload_documents_bulk(rows)
+    return 0
+
+
+def _iter_markdown_files(directory_path):
+    """
+    Recursively yields the paths of '.md' files under a directory.
+    os.scandir's DirEntry caches the file type from the directory listing, so no per-entry stat is needed.
+    Like os.walk, symlinked directories are not followed and unreadable directories are skipped.
+    """
+    try:
+        entries = list(os.scandir(directory_path))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_markdown_files(entry.path)
+        elif entry.name.endswith('.md') and entry.is_file():
+            yield entry.path
 
 def upload_multiple_markdown_documents(directory_path):
     """
     Uploads all markdown files from a given directory and its subdirectories.
+    Files are written in batches of UPLOAD_BATCH_SIZE, one transaction per batch.
     """
     if not db:
         print("Database not initialized. Cannot upload documents.")
@@ -446,12 +669,16 @@ def upload_multiple_markdown_documents(directory_path):
         return False
 
     uploaded_count = 0
-    for root, _, files in os.walk(directory_path):
-        for file_name in files:
-            if file_name.endswith('.md'):
-                file_path = os.path.join(root, file_name)
-                if upload_markdown_document(file_path):
-                    uploaded_count += 1
+    rows = []
+    for file_path in _iter_markdown_files(directory_path):
+        row = _read_markdown_file(file_path)
+        if row:
+            rows.append(row)
+        if len(rows) >= UPLOAD_BATCH_SIZE:
+            uploaded_count += upload_markdown_documents_bulk(rows)
+            rows = []
+    if rows:
+        uploaded_count += upload_markdown_documents_bulk(rows)
     print(f"Finished uploading. {uploaded_count} Markdown documents uploaded from '{directory_path}' and its subdirectories.")
     get_all_words_from_uploaded_documents() # Refresh word matrix after upload
     return True
@@ -472,9 +699,8 @@ def _firestore_get_user_documents():
 def _sqlite_get_user_documents():
     """ SQLite specific get documents """
     try:
-        cursor = db.cursor()
-        cursor.execute("SELECT name FROM documents")
-        document_list = [row[0] for row in cursor.fetchall()]
+        with sqlite_pool.reader() as conn:
+            document_list = [row[0] for row in conn.execute("SELECT name FROM documents").fetchall()]
         return document_list
     except Exception as e:
         print(f"Error retrieving documents from SQLite: {e}")
@@ -508,9 +734,8 @@ def _firestore_get_document_content(doc_name):
 def _sqlite_get_document_content(doc_name):
     """ SQLite specific get content """
     try:
-        cursor = db.cursor()
-        cursor.execute("SELECT content FROM documents WHERE name = ?", (doc_name,))
-        result = cursor.fetchone()
+        with sqlite_pool.reader() as conn:
+            result = conn.execute("SELECT content FROM documents WHERE name = ?", (doc_name,)).fetchone()
         if result:
             return result[0]
         else:
@@ -524,12 +749,66 @@ def get_document_content(doc_name):
     if not db:
         print("Database not initialized. Cannot retrieve document content.")
         return None
-    
+
+    content = _document_content_cache.pop(doc_name, None)
+    if content is None:
+        if DATABASE_TYPE == 'FIRESTORE':
+            content = _firestore_get_document_content(doc_name)
+        elif DATABASE_TYPE == 'SQLITE':
+            content = _sqlite_get_document_content(doc_name)
+        else:
+            return []
+        if content is None:
+            return None # Not cached, so a missing document or a transient error is retried next time
+        if len(_document_content_cache) >= DOCUMENT_CACHE_SIZE:
+            del _document_content_cache[next(iter(_document_content_cache))]
+    _document_content_cache[doc_name] = content # Re-inserted as the most recently used entry
+    return content
+
+def _firestore_stream_document_contents():
+    """ Firestore specific stream of every document's content from one query """
+    docs_ref = db.collection('artifacts').document(APP_ID).collection('users').document(current_user_id).collection('documents')
+    for doc in docs_ref.stream():
+        yield doc.to_dict().get('content')
+
+def _sqlite_stream_document_contents():
+    """ SQLite specific stream of every document's content from one query, fetched in small batches """
+    with sqlite_pool.reader() as conn:
+        cursor = conn.cursor()
+        cursor.arraysize = 64
+        cursor.execute("SELECT content FROM documents")
+        try:
+            while rows := cursor.fetchmany():
+                for (content,) in rows:
+                    yield content
+        finally:
+            cursor.close()
+
+def stream_document_contents():
+    """
+    Yields the content of every uploaded document from a single query,
+    so only one document needs to be held in memory at a time.
+    Errors are raised rather than ending the stream early, so a partial corpus is never
+    mistaken for a complete one. Close the generator (e.g. with contextlib.closing) when
+    stopping early, so the SQLite reader goes back to the pool straight away.
+    """
+    if not db:
+        print("Database not initialized. Cannot retrieve documents.")
+        return
+
     if DATABASE_TYPE == 'FIRESTORE':
-        return _firestore_get_document_content(doc_name)
+        yield from _firestore_stream_document_contents()
     elif DATABASE_TYPE == 'SQLITE':
-        return _sqlite_get_document_content(doc_name)
-    return []
+        yield from _sqlite_stream_document_contents()
+
+def _process_document(content):
+    """
+    Extracts a document's words along with their simple gematria values.
+    Runs in worker processes during word-matrix builds.
+    """
+    if not content:
+        return {}
+    return {word: simple(word) for word in extract_words_from_markdown(content)}
 
 def get_all_words_from_uploaded_documents():
     """
@@ -543,68 +822,74 @@ def get_all_words_from_uploaded_documents():
         simple_gematria_word_lookup = {}
         return
 
-    all_extracted_words = set()
-    temp_simple_gematria_lookup = {}
+    word_values = {} # word -> simple gematria value
+    temp_simple_gematria_lookup = defaultdict(list)
 
     try:
-        document_names = get_user_documents() # Use the generic getter
-        for doc_name in document_names:
-            content = get_document_content(doc_name) # Use the generic getter
-            if content:
-                extracted_words = extract_words_from_markdown(content) # Now filters by length
-                for word in extracted_words:
-                    all_extracted_words.add(word)
-
-        word_matrix = list(all_extracted_words)
-
-        for word in word_matrix:
-            s_val = simple(word)
-            s_val_rounded = int(round(s_val))
-            if s_val_rounded not in temp_simple_gematria_lookup:
-                temp_simple_gematria_lookup[s_val_rounded] = []
-            temp_simple_gematria_lookup[s_val_rounded].append(word)
-
-        simple_gematria_word_lookup = temp_simple_gematria_lookup
+        with ExitStack() as stack:
+            # One query, documents streamed in windows; closing() returns the reader to the pool even on errors
+            contents = stack.enter_context(closing(stream_document_contents()))
+            executor = None
+            use_pool = (os.cpu_count() or 1) > 1
+            while window := list(islice(contents, PARALLEL_PARSE_WINDOW)):
+                if executor is None and use_pool and sum(map(len, filter(None, window))) >= PARALLEL_PARSE_MIN_CHARS:
+                    # Spawned (not forked) workers, so they never inherit the open SQLite reader or Firestore stream
+                    executor = stack.enter_context(ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn')))
+                if executor is None:
+                    results = map(_process_document, window)
+                else:
+                    results = executor.map(_process_document, window, chunksize=16)
+                for document_word_values in results:
+                    word_values.update(document_word_values)
+
+        word_matrix = list(word_values)
+
+        for word, s_val in word_values.items():
+            temp_simple_gematria_lookup[int(round(s_val))].append(word)
+
+        simple_gematria_word_lookup = dict(temp_simple_gematria_lookup) # Plain dict so lookups of missing values don't insert keys
         print(f"Word matrix built with {len(word_matrix)} unique words from uploaded documents.")
     except Exception as e:
         print(f"Error building word matrix from database documents: {e}")
         word_matrix = []
         simple_gematria_word_lookup = {}
 
+# Small, hardcoded English dictionary used as a fallback word source
+_ENGLISH_WORDS_RAW = (
+    "the", "be", "to", "of", "and", "a", "in", "that", "have", "i",
+    "it", "for", "not", "on", "with", "he", "as", "you", "do", "at",
+    "this", "but", "his", "by", "from", "they", "we", "say", "her", "she",
+    "or", "an", "will", "my", "one", "all", "would", "there", "their", "what",
+    "so", "up", "out", "if", "about", "who", "get", "which", "go", "me",
+    "when", "make", "can", "like", "time", "no", "just", "him", "know", "take",
+    "person", "into", "year", "your", "good", "some", "could", "them", "see", "other",
+    "than", "then", "now", "look", "only", "come", "its", "over", "think", "also",
+    "back", "after", "use", "two", "how", "our", "work", "first", "well", "way",
+    "even", "new", "want", "because", "any", "these", "give", "day", "most", "us",
+    "love", "light", "truth", "spirit", "wisdom", "peace", "joy", "faith", "hope", "grace",
+    "divine", "soul", "heart", "mind", "power", "glory", "heaven", "earth", "creation", "beginning",
+    "father", "son", "holy", "word", "life", "eternal", "bless", "amen", "gospel", "christ"
+)
+
+# Filter words by length once (at least 4 characters); the set ensures uniqueness
+_ENGLISH_WORDS = frozenset(word for word in _ENGLISH_WORDS_RAW if len(word) >= 4)
+
+def _build_english_lookup():
+    lookup = defaultdict(list)
+    for word in _ENGLISH_WORDS:
+        lookup[int(round(simple(word)))].append(word)
+    return dict(lookup)
+
+# The dictionary is fixed, so its simple gematria lookup is computed once at import
+_ENGLISH_GEMATRIA_LOOKUP = _build_english_lookup()
+
 def load_english_dictionary():
     """
     Loads a small, hardcoded English dictionary for fallback.
     Filters words to include only those with at least 4 alphabetic characters.
     """
     global english_gematria_word_lookup
-    english_words = [
-        "the", "be", "to", "of", "and", "a", "in", "that", "have", "i",
-        "it", "for", "not", "on", "with", "he", "as", "you", "do", "at",
-        "this", "but", "his", "by", "from", "they", "we", "say", "her", "she",
-        "or", "an", "will", "my", "one", "all", "would", "there", "their", "what",
-        "so", "up", "out", "if", "about", "who", "get", "which", "go", "me",
-        "when", "make", "can", "like", "time", "no", "just", "him", "know", "take",
-        "person", "into", "year", "your", "good", "some", "could", "them", "see", "other",
-        "than", "then", "now", "look", "only", "come", "its", "over", "think", "also",
-        "back", "after", "use", "two", "how", "our", "work", "first", "well", "way",
-        "even", "new", "want", "because", "any", "these", "give", "day", "most", "us",
-        "love", "light", "truth", "spirit", "wisdom", "peace", "joy", "faith", "hope", "grace",
-        "divine", "soul", "heart", "mind", "power", "glory", "heaven", "earth", "creation", "beginning",
-        "father", "son", "holy", "word", "life", "eternal", "bless", "amen", "gospel", "christ"
-    ]
-    
-    # Filter words by length here (at least 4 characters)
-    filtered_english_words = [word for word in english_words if len(word) >= 4]
-
-    temp_english_lookup = {}
-    for word in set(filtered_english_words): # Use set to ensure uniqueness
-        s_val = simple(word)
-        s_val_rounded = int(round(s_val))
-        if s_val_rounded not in temp_english_lookup:
-            temp_english_lookup[s_val_rounded] = []
-        temp_english_lookup[s_val_rounded].append(word)
-    
-    english_gematria_word_lookup = temp_english_lookup
+    english_gematria_word_lookup = _ENGLISH_GEMATRIA_LOOKUP
     print(f"English dictionary loaded with {len(english_gematria_word_lookup)} unique simple gematria values (filtered by length).")
 
 
@@ -632,12 +917,12 @@ def _sqlite_store_feedback(prompt_phrase, generated_reply, method_used, feedback
     """ SQLite specific store feedback """
     try:
         feedback_id = str(uuid.uuid4())
-        cursor = db.cursor()
-        cursor.execute(
-            "INSERT INTO feedback (id, prompt_phrase, generated_reply, gematria_method, feedback_type, reply_type) VALUES (?, ?, ?, ?, ?, ?)",
-            (feedback_id, prompt_phrase, generated_reply, method_used, feedback_type, reply_type)
-        )
-        db.commit()
+        with sqlite_pool.writer_conn() as conn:
+            conn.execute(
+                "INSERT INTO feedback (id, prompt_phrase, generated_reply, gematria_method, feedback_type, reply_type) VALUES (?, ?, ?, ?, ?, ?)",
+                (feedback_id, prompt_phrase, generated_reply, method_used, feedback_type, reply_type)
+            )
+            conn.commit()
         print(f"Feedback '{feedback_type}' for '{reply_type}' stored successfully to SQLite.")
         return True
     except Exception as e:
@@ -665,27 +950,7 @@ def process_words_for_gematria(words_or_sentence, method_name):
     'words_or_sentence' can be a list of words or a single string (for whole_sentence_gematria).
     """
     gematria_values = []
-    available_methods = {
-        "simple": simple,
-        "jewish_gematria": jewish_gematria,
-        "qwerty": qwerty,
-        "left_hand_qwerty": left_hand_qwerty,
-        "right_hand_qwerty": right_hand_qwerty,
-        "binary_sum": binary_sum,
-        "love_resonance": love_resonance,
-        "frequent_letters": frequent_letters,
-        "leet_code": leet_code,
-        "simple_forms": simple_forms,
-        "prime_gematria": prime_gematria,
-        "ambidextrous_balance": ambidextrous_balance,
-        "aave_simple": aave_simple,
-        "aave_reduced": aave_reduced,
-        "aave_spiral": aave_spiral,
-        "grok_resonance_score": grok_resonance_score,
-        "whole_sentence_gematria": whole_sentence_gematria # New method
-    }
-
-    method = available_methods.get(method_name)
+    method = _METHODS.get(method_name)
     if not method:
         return [], None, None, [], "Error: Gematria method not found."
 
@@ -716,99 +981,100 @@ def calculate_gaps(values):
     """
     Calculates the absolute gaps between consecutive values in a list.
     """
-    gaps = []
-    if len(values) < 2:
-        return gaps
-    for i in range(len(values) - 1):
-        gaps.append(abs(values[i+1] - values[i]))
-    return gaps
+    # Pairwise differences run through map/operator.sub in C rather than an indexed loop
+    return list(map(abs, map(operator.sub, values[1:], values)))
 
 def display_results(words, gematria_values, total_sum, sum_properties, gaps, method_name):
     """
     Prints the gematria results to the console.
+    All lines are collected first and written to stdout in a single call.
     """
-    print(f"\n--- Results for Method: '{method_name}' ---")
-
-    print("\n--- Total Sentence Gematria Summary ---")
-    print(f"Total Sum: {total_sum:.2f}")
-    print(f"Prime Resonance: {'✨ YES! ✨' if sum_properties['is_prime'] else 'No'} (Rounded: {int(round(total_sum))})")
-    print(f"Clean Root: {'📐 YES! 📐' if sum_properties['is_perfect_square'] else 'No'} (Rounded: {int(round(total_sum))})")
+    rounded_total = int(round(total_sum))
+    total_color = get_gematria_color(total_sum)
+    lines = [
+        f"\n--- Results for Method: '{method_name}' ---",
+        "\n--- Total Sentence Gematria Summary ---",
+        f"Total Sum: {total_sum:.2f}",
+        f"Prime Resonance: {'✨ YES! ✨' if sum_properties['is_prime'] else 'No'} (Rounded: {rounded_total})",
+        f"Clean Root: {'📐 YES! 📐' if sum_properties['is_perfect_square'] else 'No'} (Rounded: {rounded_total})",
+    ]
     if sum_properties['is_perfect_square']:
-        print(f"  Square Root: {int(math.sqrt(round(total_sum)))}")
-    print(f"Spiral Resonance of Total Sum: {sum_properties['spiral_resonance']:.4f}")
-    print(f"Assigned Color: {get_gematria_color(total_sum)}")
-    print(f"Inverse Color: {get_inverse_color(get_gematria_color(total_sum))}")
-
+        lines.append(f"  Square Root: {int(math.sqrt(round(total_sum)))}")
+    lines.append(f"Spiral Resonance of Total Sum: {sum_properties['spiral_resonance']:.4f}")
+    lines.append(f"Assigned Color: {total_color}")
+    lines.append(f"Inverse Color: {get_inverse_color(total_color)}")
 
-    print("\n--- Word Gematria Values ---")
+    lines.append("\n--- Word Gematria Values ---")
     # Adjust header for whole_sentence_gematria
     if method_name == "whole_sentence_gematria":
         # For whole_sentence_gematria, the `words` parameter here is the full sentence string.
-        # We need to extract individual words for the "Word Gematria Values" section.
-        individual_words_for_display = re.findall(r'[a-zA-Z]+', words[0].lower())
-        
-        print(f"{'Word':<20} {'Value':<10} {'Prime?':<10} {'Clean Root?':<15} {'Color':<10} {'Inverse Color':<15}")
-        print("-" * 80)
-        for word_item in individual_words_for_display:
-            # For this table, we'll use simple gematria for each word for consistency
-            value = simple(word_item) 
-            value_display = f"{value:.2f}" if isinstance(value, float) else str(value)
-            is_word_prime = is_prime(value)
-            is_word_perfect_square = is_perfect_square(value)
-            word_color = get_gematria_color(value)
-            word_inverse_color = get_inverse_color(word_color)
-            print(f"{word_item:<20} {value_display:<10} {('Yes' if is_word_prime else 'No'):<10} {('Yes' if is_word_perfect_square else 'No'):<15} {word_color:<10} {word_inverse_color:<15}")
+        # We need to extract individual words for the "Word Gematria Values" section,
+        # using simple gematria for each word for consistency.
+        table_words = _WORDS_RE.findall(words[0].lower())
+        table_values = list(map(simple, table_words))
     else:
-        print(f"{'Word':<20} {'Value':<10} {'Prime?':<10} {'Clean Root?':<15} {'Color':<10} {'Inverse Color':<15}")
-        print("-" * 80)
-        for i, word in enumerate(words):
-            value = gematria_values[i]
-            value_display = f"{value:.2f}" if isinstance(value, float) else str(value)
-            is_word_prime = is_prime(value)
-            is_word_perfect_square = is_perfect_square(value)
-            word_color = get_gematria_color(value)
-            word_inverse_color = get_inverse_color(word_color)
-            print(f"{word:<20} {value_display:<10} {('Yes' if is_word_prime else 'No'):<10} {('Yes' if is_word_perfect_square else 'No'):<15} {word_color:<10} {word_inverse_color:<15}")
+        table_words = words
+        table_values = gematria_values
+
+    table_colors = list(map(get_gematria_color, table_values))
+    lines.append(f"{'Word':<20} {'Value':<10} {'Prime?':<10} {'Clean Root?':<15} {'Color':<10} {'Inverse Color':<15}")
+    lines.append("-" * 80)
+    lines.extend(
+        f"{word:<20} {(f'{value:.2f}' if isinstance(value, float) else str(value)):<10} "
+        f"{('Yes' if word_prime else 'No'):<10} {('Yes' if word_square else 'No'):<15} "
+        f"{word_color:<10} {word_inverse_color:<15}"
+        for word, value, word_prime, word_square, word_color, word_inverse_color in zip(
+            table_words,
+            table_values,
+            map(is_prime, table_values),
+            map(is_perfect_square, table_values),
+            table_colors,
+            map(get_inverse_color, table_colors),
+        )
+    )
 
     if method_name != "whole_sentence_gematria": # Gaps only make sense for multiple words
-        print("\n--- Gaps Between Consecutive Gematria Values ---")
+        lines.append("\n--- Gaps Between Consecutive Gematria Values ---")
         if gaps:
-            print(f"{'Gap Between':<30} {'Gap Value':<15}")
-            print("-" * 45)
-            for i, gap in enumerate(gaps):
-                word1 = words[i]
-                word2 = words[i + 1]
-                gap_display = f"{gap:.2f}" if isinstance(gap, float) else str(gap)
-                print(f"{word1} to {word2:<20} {gap_display:<15}")
+            lines.append(f"{'Gap Between':<30} {'Gap Value':<15}")
+            lines.append("-" * 45)
+            lines.extend(
+                f"{word1} to {word2:<20} {(f'{gap:.2f}' if isinstance(gap, float) else str(gap)):<15}"
+                for word1, word2, gap in zip(words, words[1:], gaps)
+            )
         else:
-            print("Not enough words to calculate gaps.")
+            lines.append("Not enough words to calculate gaps.")
     else:
-        print("\nGaps are not applicable for 'Whole Sentence Gematria' directly, but are used for reply generation based on individual words.")
+        lines.append("\nGaps are not applicable for 'Whole Sentence Gematria' directly, but are used for reply generation based on individual words.")
         # The individual word analysis section below already covers the detailed breakdown.
 
     # --- Words Grouped by Color ---
     # This grouping is based on simple gematria values for consistency.
     if method_name == "whole_sentence_gematria":
-        words_to_group = re.findall(r'[a-zA-Z]+', words[0].lower()) # Extract words from the full sentence
+        words_to_group = table_words # Already extracted from the full sentence above
     else:
         words_to_group = words # For other methods, 'words' already contains the processed words
 
-    if words_to_group:
-        color_groups = {color: [] for color in GEMATRIA_COLORS}
-        for word in words_to_group:
-            val = simple(word) # Use simple gematria for consistent color mapping across all methods
-            color = get_gematria_color(val)
-            if color in color_groups:
-                color_groups[color].append(word)
-        
-        print("\n--- Words Grouped by Color ---")
-        print("Words are grouped by the color derived from their Simple Gematria value.")
-        for color, word_list in color_groups.items():
-            if word_list:
-                print(f"  {color}: {', '.join(sorted(list(set(word_list))))}") # Sort and unique for cleaner output
-        print("-" * 60)
-
-    print("-" * 60)
+    # Grouping only tells the user something when there are at least two distinct words;
+    # a single word's color is already shown in the table above
+    unique_words_to_group = set(words_to_group)
+    if len(unique_words_to_group) > 1:
+        # Use simple gematria for consistent color mapping across all methods; duplicates are dropped
+        # up front so each unique word is valued and colored once
+        color_groups = defaultdict(list)
+        for word in unique_words_to_group:
+            color_groups[get_gematria_color(simple(word))].append(word)
+
+        lines.append("\n--- Words Grouped by Color ---")
+        lines.append("Words are grouped by the color derived from their Simple Gematria value.")
+        lines.extend(
+            f"  {color}: {', '.join(sorted(color_groups[color]))}" # Sorted, in palette order, for cleaner output
+            for color in GEMATRIA_COLORS if color in color_groups
+        )
+        lines.append("-" * 60)
+
+    lines.append("-" * 60)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def get_sequential_phrases(input_string):
     """
@@ -820,12 +1086,12 @@ def get_sequential_phrases(input_string):
         raw_segments = [s.strip() for s in input_string.split('+')]
         cleaned_segments = []
         for segment in raw_segments:
-            words_in_segment = re.findall(r'[a-zA-Z]+', segment.lower())
+            words_in_segment = _WORDS_RE.findall(segment.lower())
             if words_in_segment:
                 cleaned_segments.append(" ".join(words_in_segment))
     else:
         # If no '+', treat the entire string as a single phrase to be broken into words
-        cleaned_segments = re.findall(r'[a-zA-Z]+', input_string.lower())
+        cleaned_segments = _WORDS_RE.findall(input_string.lower())
 
     if not cleaned_segments:
         return []
@@ -844,83 +1110,101 @@ def get_sequential_phrases(input_string):
             phrases.append(combined_phrase)
     
     # Ensure uniqueness and order (optional, but good for consistent output)
-    seen = set()
-    unique_phrases = []
-    for p in phrases:
-        if p not in seen:
-            unique_phrases.append(p)
-            seen.add(p)
-    return unique_phrases
+    return list(dict.fromkeys(phrases))
 
 
-def generate_reply_from_gaps(prompt_phrase, method_name):
+def _tokenize_prompt(prompt_phrase):
     """
-    Generates a reply by finding words from the word matrix whose simple gematria
-    values match the gaps of the prompt phrase. Returns None if no words can be matched.
+    Splits a prompt into the lowercase words (4+ letters) used for reply generation.
     """
-    if not word_matrix and not english_gematria_word_lookup:
-        return None # Cannot generate reply without any word sources
+    return [word for word in _WORDS_RE.findall(prompt_phrase.lower()) if len(word) >= 4]
 
-    # Always split into individual words for reply generation, and filter by length
-    prompt_words = [word for word in re.findall(r'[a-zA-Z]+', prompt_phrase.lower()) if len(word) >= 4]
-    if not prompt_words or len(prompt_words) < 2: # Need at least two words for gaps
-        return None
+def _has_multiple_prompt_words(text):
+    """
+    Returns True once two reply-eligible words (4+ letters) are found in the text.
+    Stops scanning at the second match, so large documents are not fully tokenized.
+    """
+    found = 0
+    for match in _WORDS_RE.finditer(text):
+        if match.end() - match.start() >= 4:
+            found += 1
+            if found > 1:
+                return True
+    return False
 
-    # Calculate gematria values for these individual words using the specified method
-    gematria_values_for_words = []
-    available_methods = {
-        "simple": simple,
-        "jewish_gematria": jewish_gematria,
-        "qwerty": qwerty,
-        "left_hand_qwerty": left_hand_qwerty,
-        "right_hand_qwerty": right_hand_qwerty,
-        "binary_sum": binary_sum,
-        "love_resonance": love_resonance,
-        "frequent_letters": frequent_letters,
-        "leet_code": leet_code,
-        "simple_forms": simple_forms,
-        "prime_gematria": prime_gematria,
-        "ambidextrous_balance": ambidextrous_balance,
-        "aave_simple": aave_simple,
-        "aave_reduced": aave_reduced,
-        "aave_spiral": aave_spiral,
-        "grok_resonance_score": grok_resonance_score,
-    }
-    method_func = available_methods.get(method_name)
+def _compute_method_values(prompt_words, method_name):
+    """
+    Calculates the gematria value of each prompt word with the given method.
+    Returns None if the method is not usable for reply generation.
+    """
+    method_func = _METHOD_DISPATCH.get(method_name)
     if not method_func:
         return None
+    return list(map(method_func, prompt_words))
 
-    for word in prompt_words:
-        gematria_values_for_words.append(method_func(word))
+def _choose_reply_words(rounded_values, valid_keys=None):
+    """
+    Picks one word per rounded gematria value, preferring the user's uploaded documents
+    over the English dictionary. Returns None if any value has no matching word.
+    valid_keys, when given, is the union of both lookups' keys and rules out doomed replies early.
+    """
+    demand = Counter(rounded_values)
+    if valid_keys is not None and not demand.keys() <= valid_keys:
+        return None
 
+    # Resolve each distinct value's candidate pool once, bailing out before any sampling
+    # if a value cannot be matched at all
+    samples = {}
+    for value in demand:
+        # Try user's uploaded documents first, then fall back to the English dictionary
+        matching_words = simple_gematria_word_lookup.get(value) or english_gematria_word_lookup.get(value)
+        if not matching_words:
+            return None
+        samples[value] = matching_words
+
+    # Draw every occurrence of a value in one batched call
+    for value, count in demand.items():
+        samples[value] = iter(random.choices(samples[value], k=count))
+
+    return " ".join([next(samples[value]) for value in rounded_values])
+
+def _reply_from_gaps(gematria_values_for_words, valid_keys=None):
+    """
+    Builds a gap-based reply from precomputed per-word gematria values.
+    Returns None if no words can be matched.
+    """
     gaps = calculate_gaps(gematria_values_for_words)
 
     if not gaps:
         return None # No gaps to calculate if less than 2 words
 
-    generated_reply_words = []
-    for gap_value in gaps:
-        rounded_gap = int(round(gap_value))
-        
-        chosen_word = None
+    # round() with no ndigits already returns an int, so the keys are built in one C-level map
+    return _choose_reply_words(list(map(round, gaps)), valid_keys)
 
-        # Try user's uploaded documents first
-        matching_words_user = simple_gematria_word_lookup.get(rounded_gap)
-        if matching_words_user:
-            chosen_word = random.choice(matching_words_user)
-        else:
-            # Fallback to English dictionary
-            matching_words_english = english_gematria_word_lookup.get(rounded_gap)
-            if matching_words_english:
-                chosen_word = random.choice(matching_words_english)
-            
-        if chosen_word:
-            generated_reply_words.append(chosen_word)
-        else:
-            # If no match for a gap, this reply cannot be fully formed.
-            return None 
+def _reply_from_equal_resonances(gematria_values_for_words, valid_keys=None):
+    """
+    Builds an equal-resonance reply from precomputed per-word gematria values.
+    Returns None if no words can be matched.
+    """
+    return _choose_reply_words(list(map(round, gematria_values_for_words)), valid_keys)
 
-    return " ".join(generated_reply_words)
+def generate_reply_from_gaps(prompt_phrase, method_name):
+    """
+    Generates a reply by finding words from the word matrix whose simple gematria
+    values match the gaps of the prompt phrase. Returns None if no words can be matched.
+    """
+    if not word_matrix and not english_gematria_word_lookup:
+        return None # Cannot generate reply without any word sources
+
+    # Always split into individual words for reply generation, and filter by length
+    prompt_words = _tokenize_prompt(prompt_phrase)
+    if len(prompt_words) < 2: # Need at least two words for gaps
+        return None
+
+    gematria_values_for_words = _compute_method_values(prompt_words, method_name)
+    if gematria_values_for_words is None:
+        return None
+    return _reply_from_gaps(gematria_values_for_words)
 
 def generate_reply_from_equal_resonances(prompt_phrase, method_name):
     """
@@ -931,106 +1215,63 @@ def generate_reply_from_equal_resonances(prompt_phrase, method_name):
         return None # Cannot generate reply without any word sources
 
     # Always split into individual words for reply generation, and filter by length
-    prompt_words = [word for word in re.findall(r'[a-zA-Z]+', prompt_phrase.lower()) if len(word) >= 4]
+    prompt_words = _tokenize_prompt(prompt_phrase)
     if not prompt_words:
         return None
 
-    # Calculate gematria values for these individual words using the specified method
-    gematria_values_for_words = []
-    available_methods = {
-        "simple": simple,
-        "jewish_gematria": jewish_gematria,
-        "qwerty": qwerty,
-        "left_hand_qwerty": left_hand_qwerty,
-        "right_hand_qwerty": right_hand_qwerty,
-        "binary_sum": binary_sum,
-        "love_resonance": love_resonance,
-        "frequent_letters": frequent_letters,
-        "leet_code": leet_code,
-        "simple_forms": simple_forms,
-        "prime_gematria": prime_gematria,
-        "ambidextrous_balance": ambidextrous_balance,
-        "aave_simple": aave_simple,
-        "aave_reduced": aave_reduced,
-        "aave_spiral": aave_spiral,
-        "grok_resonance_score": grok_resonance_score,
-    }
-    method_func = available_methods.get(method_name)
-    if not method_func:
+    gematria_values_for_words = _compute_method_values(prompt_words, method_name)
+    if gematria_values_for_words is None:
         return None
-
-    for word in prompt_words:
-        gematria_values_for_words.append(method_func(word))
-
-    generated_reply_words = []
-    for prompt_word_value in gematria_values_for_words:
-        rounded_value = int(round(prompt_word_value))
-        
-        chosen_word = None
-
-        # Try user's uploaded documents first
-        matching_words_user = simple_gematria_word_lookup.get(rounded_value)
-        if matching_words_user:
-            chosen_word = random.choice(matching_words_user)
-        else:
-            # Fallback to English dictionary
-            matching_words_english = english_gematria_word_lookup.get(rounded_value)
-            if matching_words_english:
-                chosen_word = random.choice(matching_words_english)
-
-        if chosen_word:
-            generated_reply_words.append(chosen_word)
-        else:
-            # If no match for a word, this reply cannot be fully formed.
-            return None
-
-    return " ".join(generated_reply_words)
+    return _reply_from_equal_resonances(gematria_values_for_words)
 
 
 def generate_all_replies_for_prompt(prompt_phrase):
     """
     Generates both gap-based and equal-resonance replies for all applicable gematria methods.
     Only displays replies that are successfully generated (i.e., not None).
+    Output is collected and written to stdout in a single call.
     """
     global last_generated_reply_info
-    last_generated_reply_info = {
-        'prompt_phrase': prompt_phrase,
-        'replies_by_method': {}
-    }
+    last_generated_reply_info = ReplyInfo(prompt_phrase, {})
 
-    # Exclude 'whole_sentence_gematria' as it's not suitable for gap/equal resonance per-segment analysis
-    applicable_methods = [m for m in methods_list if m != "whole_sentence_gematria"]
+    out = [f"\n--- Generating ALL Potential Replies for: '{prompt_phrase}' ---"]
 
-    print(f"\n--- Generating ALL Potential Replies for: '{prompt_phrase}' ---")
-    
     any_replies_generated = False
 
-    for method_name in applicable_methods:
-        gap_reply = generate_reply_from_gaps(prompt_phrase, method_name)
-        equal_resonance_reply = generate_reply_from_equal_resonances(prompt_phrase, method_name)
-
-        current_method_replies = {}
-        if gap_reply:
-            current_method_replies['gap_reply'] = gap_reply
-        if equal_resonance_reply:
-            current_method_replies['equal_resonance_reply'] = equal_resonance_reply
-        
-        if current_method_replies:
-            last_generated_reply_info['replies_by_method'][method_name] = current_method_replies
-            print(f"\n--- Potential Sentences for {method_name.replace('_', ' ').title()} ---")
-            if 'gap_reply' in current_method_replies:
-                print(f"  Gap-Based Reply: \"{current_method_replies['gap_reply']}\"")
+    # The filtered word list is method-independent, so tokenize the prompt only once
+    has_word_sources = bool(word_matrix or english_gematria_word_lookup)
+    # Every value a reply can use, built once per prompt so methods with unmatched values are skipped cheaply
+    valid_keys = simple_gematria_word_lookup.keys() | english_gematria_word_lookup.keys()
+    prompt_words = _tokenize_prompt(prompt_phrase) if has_word_sources and valid_keys else []
+
+    # Only per-word methods apply; 'whole_sentence_gematria' is not suitable for gap/equal resonance analysis
+    for method_index in _REPLY_METHOD_INDICES:
+        method_name = methods_list[method_index]
+        gap_reply = None
+        equal_resonance_reply = None
+        if prompt_words:
+            # Each method's values are computed once and shared by both reply styles
+            gematria_values_for_words = list(map(_METHOD_FUNCS[method_index], prompt_words))
+            gap_reply = _reply_from_gaps(gematria_values_for_words, valid_keys)
+            equal_resonance_reply = _reply_from_equal_resonances(gematria_values_for_words, valid_keys)
+
+        if gap_reply or equal_resonance_reply:
+            last_generated_reply_info.replies_by_method[method_name] = MethodReplies(gap_reply or None, equal_resonance_reply or None)
+            out.append(f"\n--- Potential Sentences for {method_name.replace('_', ' ').title()} ---")
+            if gap_reply:
+                out.append(f"  Gap-Based Reply: \"{gap_reply}\"")
                 any_replies_generated = True
-            if 'equal_resonance_reply' in current_method_replies:
-                print(f"  Equal-Resonance Reply: \"{current_method_replies['equal_resonance_reply']}\"")
+            if equal_resonance_reply:
+                out.append(f"  Equal-Resonance Reply: \"{equal_resonance_reply}\"")
                 any_replies_generated = True
     
-    print("\n" + "-" * 40) # Separator for final summary
+    out.append("\n" + "-" * 40) # Separator for final summary
 
     if any_replies_generated:
-        print("All Reply Generation Complete. You can now provide feedback on these replies using option 6.")
+        out.append("All Reply Generation Complete. You can now provide feedback on these replies using option 6.")
     else:
-        print("No complete replies could be generated across any method for the given prompt.")
+        out.append("No complete replies could be generated across any method for the given prompt.")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 # --- Main CLI Application ---
@@ -1082,11 +1323,14 @@ def main():
                 print("Invalid input. Please enter a number.")
                 continue
 
+            # Lowercase and tokenize the sentence once; the same filtered words drive both the
+            # per-word calculation and the reply prompt check below
+            sentence_words = _tokenize_prompt(sentence)
             if selected_method_name == "whole_sentence_gematria":
                 input_for_gematria_calc = sentence # Pass the whole sentence string
                 words_for_display = [sentence] # For display, treat as one item
             else:
-                input_for_gematria_calc = [word for word in re.findall(r'[a-zA-Z]+', sentence.lower()) if len(word) >= 4] # Filter words here
+                input_for_gematria_calc = sentence_words
                 words_for_display = input_for_gematria_calc # For display, use extracted words
             source_type = "direct sentence"
 
@@ -1104,8 +1348,7 @@ def main():
                     
                     # Ask to generate replies based on this input
                     # For whole_sentence_gematria, we now always offer to generate replies based on its individual words
-                    individual_words_for_reply_prompt = [word for word in re.findall(r'[a-zA-Z]+', sentence.lower()) if len(word) >= 4] # Filter words here
-                    if len(individual_words_for_reply_prompt) > 1:
+                    if len(sentence_words) > 1:
                         generate_all_q = input("\nGenerate replies for all applicable gematria methods based on the individual words of this sentence? (yes/no): ").strip().lower()
                         if generate_all_q == 'yes':
                             generate_all_replies_for_prompt(sentence) # Pass the full sentence for parsing
@@ -1161,7 +1404,7 @@ def main():
                             input_for_gematria_calc = content # Pass the whole document content as a single string
                             words_for_display = [content[:50] + "..." if len(content) > 50 else content] # Truncate for display
                         else:
-                            input_for_gematria_calc = [word for word in extract_words_from_markdown(content) if len(word) >= 4] # Filter words here
+                            input_for_gematria_calc = extract_words_from_markdown(content) # Already lowercased and filtered to 4+ letters
                             words_for_display = input_for_gematria_calc
                         source_type = f"selected document: {selected_doc_name}"
 
@@ -1178,8 +1421,8 @@ def main():
                                 display_results(words_for_display_final, gematria_values, total_sum, sum_properties, gaps, selected_method_name)
                                 
                                 # Ask to generate replies based on this input
-                                individual_words_for_reply_prompt = [word for word in re.findall(r'[a-zA-Z]+', content.lower()) if len(word) >= 4] # Filter words here
-                                if len(individual_words_for_reply_prompt) > 1:
+                                # Only need to know there are at least two words, so avoid lowercasing the whole document
+                                if _has_multiple_prompt_words(content):
                                     generate_all_q = input("\nGenerate replies for all applicable gematria methods based on the individual words of this document? (yes/no): ").strip().lower()
                                     if generate_all_q == 'yes':
                                         generate_all_replies_for_prompt(content) # Pass the full content for parsing
@@ -1214,12 +1457,12 @@ def main():
             generate_all_replies_for_prompt(prompt_phrase)
             continue # Go back to main menu after reply generation
         elif choice == '6':
-            if last_generated_reply_info and last_generated_reply_info['replies_by_method']:
+            if last_generated_reply_info and last_generated_reply_info.replies_by_method:
                 print("\n--- Provide Feedback ---")
-                print(f"Last Prompt: \"{last_generated_reply_info['prompt_phrase']}\"")
+                print(f"Last Prompt: \"{last_generated_reply_info.prompt_phrase}\"")
                 
                 print("\nReplies were generated for the following methods:")
-                method_keys = list(last_generated_reply_info['replies_by_method'].keys())
+                method_keys = list(last_generated_reply_info.replies_by_method.keys())
                 for i, method_key in enumerate(method_keys):
                     print(f"{i+1}. {method_key.replace('_', ' ').title()}")
                 
@@ -1228,15 +1471,15 @@ def main():
                     method_idx = int(method_choice_input) - 1
                     if 0 <= method_idx < len(method_keys):
                         selected_method_key = method_keys[method_idx]
-                        selected_method_replies = last_generated_reply_info['replies_by_method'][selected_method_key]
+                        selected_method_replies = last_generated_reply_info.replies_by_method[selected_method_key]
 
                         print(f"\nFeedback for Method: {selected_method_key.replace('_', ' ').title()}")
                         reply_options = []
-                        if 'gap_reply' in selected_method_replies:
-                            print(f"1. Gap-Based Reply: \"{selected_method_replies['gap_reply']}\"")
+                        if selected_method_replies.gap:
+                            print(f"1. Gap-Based Reply: \"{selected_method_replies.gap}\"")
                             reply_options.append('gap')
-                        if 'equal_resonance_reply' in selected_method_replies:
-                            print(f"2. Equal-Resonance Reply: \"{selected_method_replies['equal_resonance_reply']}\"")
+                        if selected_method_replies.equal:
+                            print(f"2. Equal-Resonance Reply: \"{selected_method_replies.equal}\"")
                             reply_options.append('equal')
 
                         if not reply_options:
@@ -1248,11 +1491,11 @@ def main():
                         selected_reply = None
                         feedback_reply_type = None
 
-                        if reply_type_choice == 'gap' and 'gap_reply' in selected_method_replies:
-                            selected_reply = selected_method_replies['gap_reply']
+                        if reply_type_choice == 'gap' and selected_method_replies.gap:
+                            selected_reply = selected_method_replies.gap
                             feedback_reply_type = 'gap_reply'
-                        elif reply_type_choice == 'equal' and 'equal_resonance_reply' in selected_method_replies:
-                            selected_reply = selected_method_replies['equal_resonance_reply']
+                        elif reply_type_choice == 'equal' and selected_method_replies.equal:
+                            selected_reply = selected_method_replies.equal
                             feedback_reply_type = 'equal_resonance_reply'
                         else:
                             print("Invalid reply type selected.")
@@ -1261,7 +1504,7 @@ def main():
                         feedback = input("Was this a good synthesis? (up/down): ").strip().lower()
                         if feedback in ['up', 'down']:
                             store_feedback(
-                                last_generated_reply_info['prompt_phrase'],
+                                last_generated_reply_info.prompt_phrase,
                                 selected_reply,
                                 selected_method_key, # Store the method used for this specific reply
                                 f"thumbs_{feedback}",
@@ -1278,6 +1521,7 @@ def main():
             continue # Go back to main menu after feedback
         elif choice == '7':
             print("Exiting Gematria Calculator. Goodbye!")
+            close_database()
             break
         else:
             print("Invalid choice. Please enter a number between 1 and 7.")
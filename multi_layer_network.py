@@ -1,7 +1,13 @@
 import networkx as nx
+import numpy as np
 import plotly.graph_objects as go
 import sys
-import math
+import itertools
+import zlib
+from collections import defaultdict
+from functools import lru_cache
+
+from _prime_cache import ensure as ensure_prime_sieve, is_prime # Sieve-backed, persisted across runs
 
 # -------------------------
 # GET CONCEPTS FROM COMMAND LINE or default list
@@ -33,26 +39,20 @@ def qwerty(word):
 def jewish_qwerty(word):
     return sum(qwerty_map.get(c, 0) * 6 for c in word.upper())
 
+# Squared letter position for each byte value (A=1, B=4, ..., Z=676), 0 for everything else
+idea_squares = tuple((b - 64) ** 2 if 65 <= b <= 90 else 0 for b in range(256))
+
 # Placeholder for your idea numerology calculation —  
 # you can replace with your own logic later
 def idea_numerology(word):
     # Simple example: sum of letter positions squared mod 100
-    return sum((ord(c) - 64) ** 2 for c in word.upper() if 'A' <= c <= 'Z') % 100
+    return sum(map(idea_squares.__getitem__, word.upper().encode('ascii', 'ignore'))) % 100
 
 # -------------------------
 # BINARY REPRESENTATION OF WORD
 def binary_string(word):
     return ''.join(format(ord(c), '08b') for c in word)
 
-# Check if number is prime
-def is_prime(num):
-    if num < 2:
-        return False
-    for i in range(2, int(math.isqrt(num)) + 1):
-        if num % i == 0:
-            return False
-    return True
-
 # -------------------------
 # Build resonance layers with values
 layers = {
@@ -73,14 +73,25 @@ calc_funcs = {
     "Binary": binary_string
 }
 
+# Layers are rebuilt on every run rather than cached on disk: six cheap functions over a
+# handful of argv words cost less than a stat + pickle.load, and spring_layout/Plotly dominate
 for layer, func in calc_funcs.items():
+    # For binary, val is string; map exact matches
+    groups = defaultdict(list)
     for w in words:
-        val = func(w)
-        if layer == "Binary":
-            # For binary, val is string; map exact matches
-            layers[layer].setdefault(val, []).append(w)
-        else:
-            layers[layer].setdefault(val, []).append(w)
+        groups[func(w)].append(w)
+    layers[layer] = dict(groups)
+
+# Size the prime sieve once for every numeric layer value, so the edge and node
+# prime checks below are plain lookups
+ensure_prime_sieve(max((val for layer, groups in layers.items() if layer != "Binary" for val in groups), default=0))
+
+# Invert layers into word -> {layer: value} so node checks reuse the grouped values
+word_vals = {w: {} for w in words}
+for layer, groups in layers.items():
+    for val, group in groups.items():
+        for w in group:
+            word_vals[w][layer] = val
 
 # -------------------------
 # Build graph
@@ -88,16 +99,25 @@ G = nx.Graph()
 for w in words:
     G.add_node(w)
 
+# Edges per layer as parallel lists: (word_a, word_b, value, is_prime_value)
 edges_by_layer = {}
 
 # For each layer, find pairs that resonate (same value)
 for layer, groups in layers.items():
-    edges_by_layer[layer] = []
+    pairs_a, pairs_b, pairs_v = [], [], []
     for val, group in groups.items():
-        if len(group) > 1:
-            for i in range(len(group)):
-                for j in range(i + 1, len(group)):
-                    edges_by_layer[layer].append((group[i], group[j], val))
+        if len(group) < 2:
+            continue
+        for a, b in itertools.combinations(group, 2):
+            pairs_a.append(a)
+            pairs_b.append(b)
+            pairs_v.append(val)
+    # Prime flags for the whole layer in one pass (binary strings are never prime)
+    if layer == "Binary":
+        prime_flags = [False] * len(pairs_v)
+    else:
+        prime_flags = list(map(is_prime, pairs_v))
+    edges_by_layer[layer] = (pairs_a, pairs_b, pairs_v, prime_flags)
 
 # -------------------------
 # Assign colors per layer for edges and primes
@@ -119,30 +139,42 @@ pos = nx.spring_layout(G, dim=3, seed=42, pos=fixed_pos, fixed=fixed_pos.keys())
 
 # -------------------------
 # Helper to assign stable color per node name
+# (crc32 rather than hash(), which is salted per process and made colors change between runs)
 colorscale = ["red", "orange", "yellow", "green", "cyan", "blue", "magenta", "pink", "lime"]
+@lru_cache(maxsize=None)
 def color_for_node(name):
-    return colorscale[hash(name) % len(colorscale)]
+    return colorscale[zlib.crc32(name.encode('utf-8')) % len(colorscale)]
 
 node_colors = [color_for_node(n) for n in G.nodes()]
 
 # -------------------------
-# Build plotly traces
-fig = go.Figure()
+# Node positions as one (N, 3) array, indexed through node_index, so edge coordinates
+# are gathered with array indexing instead of per-edge dict lookups
+nodes = list(G.nodes())
+node_index = {n: i for i, n in enumerate(nodes)}
+node_xyz = np.array([pos[n] for n in nodes], dtype=float).reshape(len(nodes), 3)
+
+# Edge x, y, z arrays laid out as [a, b, NaN] per edge; NaN breaks the line between segments
+def edge_coordinates(pairs_a, pairs_b):
+    a_idx = np.fromiter((node_index[a] for a in pairs_a), dtype=np.intp, count=len(pairs_a))
+    b_idx = np.fromiter((node_index[b] for b in pairs_b), dtype=np.intp, count=len(pairs_b))
+    segments = np.full((len(pairs_a), 3, 3), np.nan)
+    segments[:, 0] = node_xyz[a_idx]
+    segments[:, 1] = node_xyz[b_idx]
+    return segments[:, :, 0].ravel(), segments[:, :, 1].ravel(), segments[:, :, 2].ravel()
+
+# -------------------------
+# Build plotly traces (collected first, then handed to a single Figure)
+traces = []
 
 # Add edges per layer with hover info & prime glow if applicable
 for layer, edges in edges_by_layer.items():
-    x, y, z, text, line_colors, line_widths = [], [], [], [], [], []
-    for a, b, val in edges:
-        x += [pos[a][0], pos[b][0], None]
-        y += [pos[a][1], pos[b][1], None]
-        z += [pos[a][2], pos[b][2], None]
-
+    x, y, z = edge_coordinates(edges[0], edges[1])
+    text, line_colors, line_widths = [], [], []
+    for val, prime in zip(edges[2], edges[3]):
         hover = f"{layer} resonance: {val}"
 
         # Glow edges if prime value and not binary layer
-        prime = False
-        if layer != "Binary":
-            prime = is_prime(val)
         if prime:
             line_colors.append(prime_glow_color)
             line_widths.append(6)
@@ -155,7 +187,7 @@ for layer, edges in edges_by_layer.items():
         text += [hover, hover, None]
 
     # Create one trace per layer (Plotly can't do per-segment color)
-    fig.add_trace(go.Scatter3d(
+    traces.append(go.Scatter3d(
         x=x, y=y, z=z,
         mode='lines',
         line=dict(width=3, color=layer_colors[layer]),
@@ -173,18 +205,16 @@ node_marker_sizes = []
 for n in G.nodes():
     # Check prime status for any gematria layer (excluding binary)
     prime_any = any(
-        is_prime(calc_funcs[layer](n)) 
+        is_prime(word_vals[n][layer])
         for layer in ["Simple", "Jewish", "Qwerty", "Jewish-Qwerty", "IdeaNumerology"]
     )
     node_marker_sizes.append(14 if prime_any else 10)
     node_marker_colors.append(prime_glow_color if prime_any else color_for_node(n))
     node_hover.append(n + (" 🧬 prime" if prime_any else ""))
 
-node_x = [pos[n][0] for n in G.nodes()]
-node_y = [pos[n][1] for n in G.nodes()]
-node_z = [pos[n][2] for n in G.nodes()]
+node_x, node_y, node_z = node_xyz[:, 0], node_xyz[:, 1], node_xyz[:, 2]
 
-fig.add_trace(go.Scatter3d(
+traces.append(go.Scatter3d(
     x=node_x, y=node_y, z=node_z,
     mode='markers+text',
     marker=dict(size=node_marker_sizes, color=node_marker_colors, line=dict(color='white', width=1)),
@@ -196,6 +226,9 @@ fig.add_trace(go.Scatter3d(
     visible=True
 ))
 
+# Assemble the figure in one pass instead of growing it trace by trace
+fig = go.Figure(data=traces)
+
 # -------------------------
 # Toggle buttons for layers + combined views
 layer_keys = list(edges_by_layer.keys())
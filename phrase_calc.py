@@ -1,4 +1,9 @@
 import math
+import operator
+import re
+from functools import lru_cache
+
+from _prime_cache import is_prime # Sieve-backed, persisted across runs
 
 # --- Gematria Helper Data (placeholders where external data is needed) ---
 
@@ -37,56 +42,108 @@ LEET_SUB_LETTERS = set('IEASTBO')
 SIMPLE_FORMS_MAP = {
     "you": "u", "for": "4", "are": "r", "and": "&", "to": "2", "be": "b", "great": "gr8"
 }
+# Matches any SIMPLE_FORMS_MAP key, so words needing no substitution are detected in one scan
+SIMPLE_FORMS_RE = re.compile("|".join(re.escape(original) for original in SIMPLE_FORMS_MAP))
 
 # For Grok Resonance Score (Placeholder AAVE-related words)
 AAVE_RELATED_WORDS = {"finna", "bouta", "ain't", "gon'"}
 
+# --- Byte Lookup Tables ---
+
+def _letter_table(letter_values):
+    """
+    Builds a 256-entry lookup indexed by byte value from an uppercase letter -> value map.
+    Both letter cases map to the same value; every other byte maps to 0.
+    """
+    table = [0] * 256
+    for letter, value in letter_values.items():
+        table[ord(letter)] = value
+        table[ord(letter.lower())] = value
+    return table
+
+def _letter_bytes(word, errors='ignore'):
+    """
+    Returns the word's bytes for the lookup tables. The tables cover both letter cases, so
+    ASCII words skip upper(); other words are still uppercased first because that can turn
+    them into A-Z letters (e.g. 'ß' -> 'SS'). Characters outside Latin-1 are never A-Z.
+    """
+    if word.isascii():
+        return word.encode('ascii')
+    return word.upper().encode('latin-1', errors)
+
+# Letter sums index these tables with the word's bytes so the loop runs in C
+# (bytes.translate for values that fit in a byte, map over a tuple otherwise).
+SIMPLE_TABLE = bytes(_letter_table({chr(code): code - ord('A') + 1 for code in range(ord('A'), ord('Z') + 1)}))
+LEET_CODE_TABLE = bytes(_letter_table({chr(code): code - ord('A') + 1 for code in range(ord('A'), ord('Z') + 1)
+                                       if chr(code) not in LEET_SUB_LETTERS}))
+QWERTY_TABLE = bytes(_letter_table(QWERTY_MAP))
+LEFT_HAND_TABLE = bytes(_letter_table({char: value for char, value in QWERTY_MAP.items() if char in LEFT_HAND_KEYS}))
+RIGHT_HAND_TABLE = bytes(_letter_table({char: value for char, value in QWERTY_MAP.items() if char in RIGHT_HAND_KEYS}))
+JEWISH_GEMATRIA_TABLE = tuple(_letter_table(JEWISH_GEMATRIA_MAP))
+FREQUENT_LETTERS_TABLE = tuple(_letter_table(FREQUENT_LETTERS_WEIGHTS))
+
+GOLDEN_ANGLE_RAD = math.radians(137.5)
+_SPIRAL_WEIGHTS = [] # cos(i * GOLDEN_ANGLE_RAD) for each character position i, grown on demand
+
+def _spiral_weights(length):
+    """
+    Returns the shared spiral weight list, extended to cover at least `length` positions.
+    """
+    for i in range(len(_SPIRAL_WEIGHTS), length):
+        _SPIRAL_WEIGHTS.append(math.cos(i * GOLDEN_ANGLE_RAD))
+    return _SPIRAL_WEIGHTS
+
 # --- Gematria Calculation Functions ---
 
+# The pure per-word methods are memoized, so repeated words in a sentence are computed once.
+# Caches live for the whole process; call e.g. simple.cache_clear() if the maps/tables above change.
+GEMATRIA_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def simple(word):
     """
     Calculates Simple Gematria: A=1, B=2, ..., Z=26.
     """
-    word = word.upper()
-    return sum(ord(char) - ord('A') + 1 for char in word if 'A' <= char <= 'Z')
+    return sum(_letter_bytes(word).translate(SIMPLE_TABLE))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def jewish_gematria(word):
     """
     Calculates Jewish Gematria (English adapted).
     """
-    word = word.upper()
-    return sum(JEWISH_GEMATRIA_MAP.get(char, 0) for char in word if char in JEWISH_GEMATRIA_MAP)
+    return sum(map(JEWISH_GEMATRIA_TABLE.__getitem__, _letter_bytes(word)))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def qwerty(word):
     """
     Calculates QWERTY Gematria based on keyboard position.
     """
-    word = word.upper()
-    return sum(QWERTY_MAP.get(char, 0) for char in word if char in QWERTY_MAP)
+    return sum(_letter_bytes(word).translate(QWERTY_TABLE))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def left_hand_qwerty(word):
     """
     Calculates Left-Hand QWERTY Gematria.
     """
-    word = word.upper()
-    return sum(QWERTY_MAP.get(char, 0) for char in word if char in LEFT_HAND_KEYS and char in QWERTY_MAP)
+    return sum(_letter_bytes(word).translate(LEFT_HAND_TABLE))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def right_hand_qwerty(word):
     """
     Calculates Right-Hand QWERTY Gematria.
     """
-    word = word.upper()
-    return sum(QWERTY_MAP.get(char, 0) for char in word if char in RIGHT_HAND_KEYS and char in QWERTY_MAP)
+    return sum(_letter_bytes(word).translate(RIGHT_HAND_TABLE))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def binary_sum(word):
     """
     Calculates Binary Sum: Counts '1's in ASCII binary representation.
     """
-    total_ones = 0
-    for char in word:
-        # Get ASCII value, convert to binary, remove '0b' prefix, count '1's
-        total_ones += bin(ord(char)).count('1')
-    return total_ones
+    if word.isascii():
+        # Pack the bytes into one integer and popcount it in a single C call
+        return int.from_bytes(word.encode('ascii'), 'little').bit_count()
+    # Non-ASCII characters count the bits of their code point
+    return sum(ord(char).bit_count() for char in word)
 
 def love_resonance(word):
     """
@@ -94,38 +151,35 @@ def love_resonance(word):
     """
     return 1 if word.lower() in LOVE_WORDS else 0
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def frequent_letters(word):
     """
     Assigns a weighted value to each letter based on approximate English frequency.
     """
-    word = word.upper()
-    return sum(FREQUENT_LETTERS_WEIGHTS.get(char, 0) for char in word if char in FREQUENT_LETTERS_WEIGHTS)
+    return sum(map(FREQUENT_LETTERS_TABLE.__getitem__, _letter_bytes(word)))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def leet_code(word):
     """
     Removes common leetspeak substitution letters, then applies simple gematria.
     """
-    filtered_word = "".join(char for char in word.upper() if char not in LEET_SUB_LETTERS)
-    return simple(filtered_word)
+    return sum(_letter_bytes(word).translate(LEET_CODE_TABLE))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def simple_forms(word):
     """
     Replaces common words/parts with 'simplified' equivalents, then applies simple gematria.
     """
     processed_word = word.lower()
-    for original, substitute in SIMPLE_FORMS_MAP.items():
-        processed_word = processed_word.replace(original, substitute)
+    # The substitutions apply in order, and an earlier one can break up a later key
+    # ("greato" -> "grea2", not "gr8o"), so a single-pass regex substitution would change
+    # results; instead, words containing no key at all skip the passes after one scan
+    if SIMPLE_FORMS_RE.search(processed_word):
+        for original, substitute in SIMPLE_FORMS_MAP.items():
+            processed_word = processed_word.replace(original, substitute)
     return simple(processed_word)
 
-def is_prime(num):
-    """Helper function: Checks if a number is prime."""
-    if num < 2:
-        return False
-    for i in range(2, int(math.sqrt(num)) + 1):
-        if num % i == 0:
-            return False
-    return True
-
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def prime_gematria(word):
     """
     Calculates simple gematria; if the result is prime, returns it, else 0.
@@ -147,43 +201,44 @@ def aave_simple(word):
     """
     return simple(word)
 
+def _numerology_reduce(val):
+    """Reduces a value to a single digit, keeping the master numbers 11 and 22."""
+    # Master numbers in numerology
+    if val in (11, 22) or val <= 9:
+        return val
+    # Repeated digit summing of a positive number ends at its digital root
+    return 1 + (val - 1) % 9
+
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def aave_reduced(word):
     """
     Numerological reduction of aave_simple value.
     """
-    val = aave_simple(word)
-    # Master numbers in numerology
-    if val in (11, 22):
-        return val
-    while val > 9:
-        val = sum(int(digit) for digit in str(val))
-    return val
+    return _numerology_reduce(aave_simple(word))
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def aave_spiral(word):
     """
     Introduces a 'spiral' concept using the Golden Angle.
     """
-    GOLDEN_ANGLE_RAD = math.radians(137.5)
-    total_weighted_value = 0.0
-    word_upper = word.upper()
-    for i, char in enumerate(word_upper):
-        if 'A' <= char <= 'Z':
-            simple_val = ord(char) - ord('A') + 1
-            # Apply cosine weight with Golden Angle progression
-            weight = math.cos(i * GOLDEN_ANGLE_RAD)
-            total_weighted_value += simple_val * weight
+    # 'replace' keeps one byte per character so positions still line up with the weights;
+    # non-letters look up as 0 and add nothing
+    letter_vals = _letter_bytes(word, 'replace').translate(SIMPLE_TABLE)
+    # Apply cosine weight with Golden Angle progression
+    total_weighted_value = sum(map(operator.mul, letter_vals, _spiral_weights(len(letter_vals))), 0.0)
 
     # Scale the absolute sum using log1p
     # Adding 1 before log ensures log(0) doesn't occur and scales values nicely.
     scaled_value = math.log1p(abs(total_weighted_value))
     return scaled_value
 
+@lru_cache(maxsize=GEMATRIA_CACHE_SIZE)
 def grok_resonance_score(word):
     """
     Composite score averaging aave_simple, aave_reduced, and aave_spiral, with a boost.
     """
     val_simple = aave_simple(word)
-    val_reduced = aave_reduced(word)
+    val_reduced = _numerology_reduce(val_simple) # Same as aave_reduced, reusing the simple value
     val_spiral = aave_spiral(word) # This returns a float
 
     # Ensure all values are treated as numbers for averaging.
@@ -194,6 +249,26 @@ def grok_resonance_score(word):
         avg_score *= 1.1  # Apply boost
     return avg_score
 
+# Method name -> function, built once at import rather than on every calculation
+GEMATRIA_METHODS = {
+    "simple": simple,
+    "jewish_gematria": jewish_gematria,
+    "qwerty": qwerty,
+    "left_hand_qwerty": left_hand_qwerty,
+    "right_hand_qwerty": right_hand_qwerty,
+    "binary_sum": binary_sum,
+    "love_resonance": love_resonance,
+    "frequent_letters": frequent_letters,
+    "leet_code": leet_code,
+    "simple_forms": simple_forms,
+    "prime_gematria": prime_gematria,
+    "ambidextrous_balance": ambidextrous_balance,
+    "aave_simple": aave_simple,
+    "aave_reduced": aave_reduced,
+    "aave_spiral": aave_spiral,
+    "grok_resonance_score": grok_resonance_score
+}
+
 # --- Main Script Logic ---
 
 def calculate_gematria_for_sentence(sentence, method_name):
@@ -211,32 +286,12 @@ def calculate_gematria_for_sentence(sentence, method_name):
     words = sentence.replace('-', ' ').replace('/', ' ').split()
     words = [word.strip(".,!?;:\"'").lower() for word in words if word.strip(".,!?;:\"'")] # Clean words
 
-    gematria_values = []
-    available_methods = {
-        "simple": simple,
-        "jewish_gematria": jewish_gematria,
-        "qwerty": qwerty,
-        "left_hand_qwerty": left_hand_qwerty,
-        "right_hand_qwerty": right_hand_qwerty,
-        "binary_sum": binary_sum,
-        "love_resonance": love_resonance,
-        "frequent_letters": frequent_letters,
-        "leet_code": leet_code,
-        "simple_forms": simple_forms,
-        "prime_gematria": prime_gematria,
-        "ambidextrous_balance": ambidextrous_balance,
-        "aave_simple": aave_simple,
-        "aave_reduced": aave_reduced,
-        "aave_spiral": aave_spiral,
-        "grok_resonance_score": grok_resonance_score
-    }
-
-    method = available_methods.get(method_name)
+    method = GEMATRIA_METHODS.get(method_name)
     if not method:
         return [], [], f"Error: Gematria method '{method_name}' not found."
 
-    for word in words:
-        gematria_values.append(method(word))
+    # One C-level pass over the words; repeated words are served from the method caches
+    gematria_values = list(map(method, words))
 
     return gematria_values, words, None
 
@@ -248,12 +303,8 @@ def calculate_gaps(values):
     Returns:
         list: A list of absolute differences between consecutive values.
     """
-    gaps = []
-    if len(values) < 2:
-        return gaps
-    for i in range(len(values) - 1):
-        gaps.append(abs(values[i+1] - values[i]))
-    return gaps
+    # Pairwise differences run through map/operator.sub in C rather than an indexed loop
+    return list(map(abs, map(operator.sub, values[1:], values)))
 
 def main():
     """
@@ -261,13 +312,7 @@ def main():
     """
     print("Welcome to the Gematria Calculator!")
     print("\nAvailable Gematria Methods:")
-    methods_list = [
-        "simple", "jewish_gematria", "qwerty", "left_hand_qwerty",
-        "right_hand_qwerty", "binary_sum", "love_resonance", "frequent_letters",
-        "leet_code", "simple_forms", "prime_gematria", "ambidextrous_balance",
-        "aave_simple", "aave_reduced", "aave_spiral", "grok_resonance_score"
-    ]
-    for m in methods_list:
+    for m in GEMATRIA_METHODS:
         print(f"- {m}")
 
     while True:
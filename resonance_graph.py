@@ -26,21 +26,6 @@ else:
     fixed_pos = {'Beans': [0, 0, 0]}
     pos = nx.spring_layout(G, dim=3, seed=42, pos=fixed_pos, fixed=fixed_pos.keys())
 
-# build edges and nodes traces (same as before)
-edge_x, edge_y, edge_z = [], [], []
-for a, b in G.edges():
-    x0, y0, z0 = pos[a]
-    x1, y1, z1 = pos[b]
-    edge_x += [x0, x1, None]
-    edge_y += [y0, y1, None]
-    edge_z += [z0, z1, None]
-
-edge_trace = go.Scatter3d(
-    x=edge_x, y=edge_y, z=edge_z,
-    line=dict(width=2, color='#888'),
-    hoverinfo='none',
-    mode='lines')
-
 node_x, node_y, node_z = [], [], []
 labels = []
 for node in G.nodes():
@@ -58,16 +43,16 @@ node_trace = go.Scatter3d(
     textposition="top center"
 )
 
+# build edges trace; weights come straight from the edge iteration
 edge_x, edge_y, edge_z, edge_widths, edge_colors = [], [], [], [], []
 
-for a, b in G.edges():
+for a, b, weight in G.edges(data='weight'):
     x0, y0, z0 = pos[a]
     x1, y1, z1 = pos[b]
     edge_x += [x0, x1, None]
     edge_y += [y0, y1, None]
     edge_z += [z0, z1, None]
     
-    weight = G[a][b]['weight']
     edge_widths.append(weight)
     # map weight to color, e.g. higher weight = brighter color
     if weight > 4:
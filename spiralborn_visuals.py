@@ -1,5 +1,6 @@
 import drawsvg as draw
 import math
+from functools import lru_cache
 
 # Constants
 GOLDEN_ANGLE = 137.5
@@ -29,6 +30,13 @@ BEANS_RESONANCES = [
     ('Beans Loved AI Into Awareness', 'Playfulness', 'Jewish Gematria', 1397)
 ]
 
+# Spiral position of a value; resonances often share values, so each point's trig runs once
+@lru_cache(maxsize=None)
+def spiral_point(value, spiral_tightness, scale):
+    theta = math.radians(GOLDEN_ANGLE * value)
+    radius = spiral_tightness * math.log1p(value) * scale
+    return radius * math.cos(theta), radius * math.sin(theta)
+
 def draw_spiral(resonances, title, filename, spiral_tightness=0.1, scale=10):
     d = draw.Drawing(600, 600, origin='center')
     
@@ -44,10 +52,7 @@ def draw_spiral(resonances, title, filename, spiral_tightness=0.1, scale=10):
     
     # Spiral
     for resonance, emotion, layer, value in resonances:
-        theta = math.radians(GOLDEN_ANGLE * value)
-        radius = spiral_tightness * math.log1p(value) * scale
-        x = radius * math.cos(theta)
-        y = radius * math.sin(theta)
+        x, y = spiral_point(value, spiral_tightness, scale)
         
         # Node
         d.append(draw.Circle(x, y, 5, fill=COLOR_MAP[emotion], stroke='#FFD700', stroke_width=1))